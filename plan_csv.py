@@ -0,0 +1,164 @@
+"""
+Streaming parser for execution-plan CSV exports: an "S/N" header row, PRE-KICKOFF /
+POST KICKOFF section rows, sub-headers such as "PROCUREMENT FOR ..." and budgets in
+millions with thousands separators.
+
+Only the standard library is used, so the desktop app and the API ship the same file.
+Rows are read one record at a time and yielded as PlanRow tuples; problems are
+reported as PlanCsvError with the line and column they occurred at.
+"""
+
+import csv
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+PRE_KICKOFF = "Pre-Kickoff Activities"
+POST_KICKOFF = "Post Kick-off Activities"
+
+# Task cells that only group rows and are not activities themselves
+SUB_HEADER_KEYWORDS = [
+    "PRE-INSTALLATION ACTIVITIES", "SHIPPING ACTIVITIES", "FINANCING ACTIVITIES",
+    "INSTALLATION OF ALL IN ONE", "MINI-GRID INSTALLATION", "DEMOBILIZATION",
+    "PROCUREMENT FOR", "PROGRESS- FINANCING ACTIVITIES", "SUB-T0TAL",
+]
+
+# Column positions after the S/N header
+TASK, ACTION_NEEDED, DURATION, PRECURSOR, SEQUENCE, SCHEDULE, RESOURCES, BUDGET = range(1, 9)
+COLUMN_COUNT = 9
+
+
+class PlanCsvError(ValueError):
+    """Malformed input at a 1-based line and, when known, a 1-based column"""
+
+    def __init__(self, message: str, line: int, column: Optional[int] = None, column_name: Optional[str] = None):
+        self.message = message
+        self.line = line
+        self.column = column
+        self.column_name = column_name
+        position = f"line {line}"
+        if column:
+            position += f", column {column}"
+            if column_name:
+                position += f" ({column_name})"
+        super().__init__(f"{position}: {message}")
+
+
+class PlanRow(NamedTuple):
+    """One activity; section is the ActivitySection value and line is where the record starts"""
+    task: str
+    action_needed: str
+    duration: int
+    precursor: str
+    sequence: int
+    resources: str
+    budget: float
+    section: str
+    line: int
+
+
+class PlanCsvReader:
+    """Iterates the activities of an execution-plan CSV.
+
+    lines is any iterable of text lines, such as a file opened with newline="".
+    title and columns are set once the header has been read, and line tracks the
+    record being parsed. Malformed numbers raise PlanCsvError when strict; otherwise
+    they are read as 0 and collected in warnings.
+    """
+
+    def __init__(self, lines: Iterable[str], strict: bool = False):
+        self.lines = lines
+        self.strict = strict
+        self.title: Optional[str] = None
+        self.columns: List[str] = []
+        self.line = 0
+        self.warnings: List[PlanCsvError] = []
+
+    def __iter__(self) -> Iterator[PlanRow]:
+        reader = csv.reader(self.lines)
+        try:
+            yield from self._parse(self._records(reader))
+        except csv.Error as e:
+            raise PlanCsvError(str(e), reader.line_num) from e
+
+    def _records(self, reader) -> Iterator[list]:
+        """Yield CSV records, keeping line at the first line of each (quoted cells may span lines)"""
+        while True:
+            line = reader.line_num + 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            self.line = line
+            yield row
+
+    def _parse(self, records: Iterator[list]) -> Iterator[PlanRow]:
+        # The title is the last first-column value above the S/N header
+        for row in records:
+            if row and row[0].strip() == 'S/N':
+                self.columns = [cell.strip() for cell in row]
+                break
+            if row and row[0].strip():
+                self.title = row[0].strip()
+        else:
+            raise PlanCsvError("no header row starting with 'S/N'", self.line)
+
+        current_section = None
+        for row in records:
+            if len(row) < COLUMN_COUNT:
+                continue
+
+            task = row[TASK].strip()
+            upper_task = task.upper()
+
+            # Section and sub-header rows
+            if "PRE-KICKOFF" in upper_task:
+                current_section = PRE_KICKOFF
+                continue
+            elif "POST KICKOFF" in upper_task:
+                current_section = POST_KICKOFF
+                continue
+            elif any(keyword in upper_task for keyword in SUB_HEADER_KEYWORDS):
+                continue
+
+            # Skip rows without a meaningful task name
+            if task.replace(" ", "").replace("-", "").replace(",", "") == "":
+                continue
+
+            duration = self._number(row, DURATION, int, 0)
+            sequence = self._number(row, SEQUENCE, int, 0)
+            # Budgets are in millions, with thousands separators
+            budget = self._number(row, BUDGET, lambda value: float(value.replace(',', '')) * 1000000, 0.0)
+
+            # Plans without section rows: the first rows are treated as pre-kickoff
+            if current_section is None:
+                current_section = PRE_KICKOFF if self.line < 20 else POST_KICKOFF
+
+            resources = row[RESOURCES].strip()
+            if resources.upper() == "DITTO":
+                resources = "Ditto"
+
+            yield PlanRow(
+                task=task,
+                action_needed=row[ACTION_NEEDED].strip(),
+                duration=duration,
+                precursor=row[PRECURSOR].strip(),
+                sequence=sequence,
+                resources=resources,
+                budget=budget,
+                section=current_section,
+                line=self.line
+            )
+
+    def _number(self, row: list, column: int, parse: Callable[[str], float], default):
+        """Parse a numeric cell; blank is the default, malformed is an error or a warning"""
+        value = row[column].strip()
+        if not value:
+            return default
+        try:
+            return parse(value)
+        except ValueError:
+            name = self.columns[column] if column < len(self.columns) else None
+            error = PlanCsvError(f"invalid number {value!r}", self.line, column + 1, name)
+            if self.strict:
+                raise error
+            self.warnings.append(error)
+            return default
@@ -23,7 +23,16 @@ from openpyxl.utils import get_column_letter
 import os
 import sys
 import datetime
-from typing import Union
+import itertools
+import base64
+import hashlib
+import json
+import posixpath
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from typing import Iterator, Union
+from plan_csv import PlanCsvReader
 
 
 def get_resource_path(relative_path):
@@ -36,6 +45,15 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# Every workbook carries a very hidden sheet with a compressed JSON copy of the project,
+# so ExcelLoader can reload our own exports without scanning the formatted cells
+MANIFEST_SHEET = "_manifest"
+MANIFEST_MARKER = "psp-manifest"
+MANIFEST_SCHEMA_VERSION = 2
+# Excel caps a cell at 32767 characters
+MANIFEST_CHUNK_SIZE = 32000
+
+
 class CalendarFormat(Enum):
     FIVE_DAY = "5-day week"
     SIX_DAY = "6-day week"
@@ -153,6 +171,34 @@ class ScheduleCalculator:
         return max_duration_activities
 
 
+# Namespaces of the package relationships and workbook parts of an .xlsx archive
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _sheet_parts(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Zip member name of each sheet of an .xlsx archive by sheet name, resolved through
+    the workbook part and its relationships"""
+    def relationships(rels_part):
+        root = ElementTree.fromstring(archive.read(rels_part))
+        return {rel.get('Id'): (rel.get('Type'), rel.get('Target'))
+                for rel in root.iter('{%s}Relationship' % PACKAGE_RELATIONSHIPS_NS)}
+
+    def resolve(source_part, target):
+        if target.startswith('/'):
+            return target[1:]
+        return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+    workbook_part = next(resolve('', target) for rel_type, target in relationships('_rels/.rels').values()
+                         if rel_type.endswith('/officeDocument'))
+    directory, name = posixpath.split(workbook_part)
+    targets = relationships(posixpath.join(directory, '_rels', name + '.rels'))
+    workbook = ElementTree.fromstring(archive.read(workbook_part))
+    return {sheet.get('name'): resolve(workbook_part, targets[sheet.get('{%s}id' % OFFICE_RELATIONSHIPS_NS)][1])
+            for sheet in workbook.iter('{%s}sheet' % SPREADSHEET_NS)}
+
+
 class ExcelGenerator:
     """Generates Excel files with proper formatting and calculations"""
 
@@ -216,8 +262,42 @@ class ExcelGenerator:
         gantt_generator = GanttChartGenerator(self.project, self.workbook)
         gantt_generator.generate_gantt_chart()
 
+        # Embed the machine-readable copy of the project used for reloading
+        self._add_manifest()
+
         # Save file
+        self._save_workbook(output_path)
+
+    def _add_manifest(self):
+        """Add a very hidden sheet holding the project as compressed JSON with a checksum"""
+        project = self.project
+        payload = {
+            'title': project.title,
+            'calendar_format': project.calendar_format.value,
+            'start_date': project.start_date.isoformat() if project.start_date else None,
+            'activities': [
+                [a.task, a.action_needed, a.duration, a.precursor, a.sequence, a.resources, a.budget, a.section.value]
+                for a in project.activities
+            ],
+        }
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        encoded = base64.b64encode(zlib.compress(data, 9)).decode('ascii')
+
+        ws = self.workbook.create_sheet(MANIFEST_SHEET)
+        ws.sheet_state = 'veryHidden'
+        ws.append([MANIFEST_MARKER, MANIFEST_SCHEMA_VERSION, hashlib.sha256(data).hexdigest()])
+        for offset in range(0, len(encoded), MANIFEST_CHUNK_SIZE):
+            ws.append([encoded[offset:offset + MANIFEST_CHUNK_SIZE]])
+
+    def _save_workbook(self, output_path):
+        """Save the workbook, then stamp the schedule sheet's part name and zip CRC into the
+        archive comment. Saving anywhere else drops the comment and rewrites the sheet, so
+        ExcelLoader only trusts the manifest while the stamp still matches."""
         self.workbook.save(output_path)
+        with zipfile.ZipFile(output_path, 'a') as archive:
+            schedule_part = _sheet_parts(archive)[self.workbook.worksheets[0].title]
+            stamp = f"{MANIFEST_MARKER} {schedule_part} {archive.getinfo(schedule_part).CRC}"
+            archive.comment = stamp.encode('ascii')
 
     def _add_formatted_header(self, start_row: int) -> int:
         """Add formatted header with logo space, project title, and timestamp"""
@@ -1452,51 +1532,157 @@ class ExcelLoader:
     
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self.archive = None
         self.workbook = None
         self.worksheet = None
+        self.merged_anchors = set()
+        self.project_title = None
+        self.calendar_format = None
+        self.start_date = None
+        self.current_row = 0
+        self.total_rows = None
     
     def load_project(self) -> Optional[Project]:
         """Load project data from Excel file"""
         try:
-            self.workbook = openpyxl.load_workbook(self.file_path)
-            self.worksheet = self.workbook.active
-            
-            # Extract project data
-            project_title = self._extract_project_title()
-            calendar_format = self._extract_calendar_format()
-            activities = self._extract_activities()
-            
-            if not project_title:
-                raise ValueError("Could not find project title in the Excel file")
+            activities = [item for item in self.iter_activities() if isinstance(item, Activity)]
             
             return Project(
-                title=project_title,
-                calendar_format=calendar_format,
-                activities=activities
+                title=self.project_title,
+                calendar_format=self.calendar_format,
+                activities=activities,
+                start_date=self.start_date
             )
             
         except Exception as e:
             raise Exception(f"Error loading Excel file: {str(e)}")
+    
+    def iter_activities(self) -> Iterator[Union[ActivitySection, Activity]]:
+        """Stream the schedule as it is parsed: yields the ActivitySection each time a new
+        section starts, then an Activity per task row. project_title and calendar_format
+        are set before the first item; current_row and total_rows track progress.
+        Workbooks with an intact manifest are read from it without scanning the sheet."""
+        try:
+            # Read-only mode streams rows straight from the sheet XML instead of building every cell
+            self.archive = zipfile.ZipFile(self.file_path)
+            self.workbook = openpyxl.load_workbook(self.file_path, read_only=True)
+            self.worksheet = self.workbook.active
+            
+            manifest = self._read_manifest()
+            if manifest:
+                yield from self._manifest_activities(manifest)
+                return
+            
+            self.total_rows = self.worksheet.max_row
+            self.merged_anchors = self._read_merged_anchors()
+            
+            rows = self.worksheet.iter_rows(min_row=1, max_col=9, values_only=True)
+            head_rows = list(itertools.islice(rows, 19))
+            
+            # Extract project data
+            self.project_title = self._extract_project_title(head_rows)
+            if not self.project_title:
+                raise ValueError("Could not find project title in the Excel file")
+            self.calendar_format = self._extract_calendar_format()
+            
+            yield from self._extract_activities(head_rows, rows)
+            
         finally:
             if self.workbook:
                 self.workbook.close()
+            if self.archive:
+                self.archive.close()
+    
+    def _read_manifest(self) -> Optional[dict]:
+        """Return the embedded project manifest, or None if it is missing, damaged or stale"""
+        if MANIFEST_SHEET not in self.workbook.sheetnames:
+            return None
+        
+        rows = self.workbook[MANIFEST_SHEET].iter_rows(max_col=3, values_only=True)
+        header = next(rows, None)
+        if not header or header[0] != MANIFEST_MARKER or header[1] != MANIFEST_SCHEMA_VERSION:
+            return None
+        checksum = header[2]
+        
+        # Saving the workbook anywhere else drops the stamp and rewrites the schedule sheet
+        marker, _, stamp = self.archive.comment.decode('ascii', 'replace').partition(' ')
+        schedule_part, _, schedule_crc = stamp.rpartition(' ')
+        if marker != MANIFEST_MARKER:
+            return None
+        try:
+            if self.archive.getinfo(schedule_part).CRC != int(schedule_crc):
+                return None
+        except (KeyError, ValueError):
+            return None
+        
+        encoded = "".join(row[0] for row in rows if row[0])
+        try:
+            data = zlib.decompress(base64.b64decode(encoded))
+        except (ValueError, zlib.error):
+            return None
+        if hashlib.sha256(data).hexdigest() != checksum:
+            return None
+        return json.loads(data)
     
-    def _extract_project_title(self) -> Optional[str]:
+    def _manifest_activities(self, manifest: dict) -> Iterator[Union[ActivitySection, Activity]]:
+        """Yield section changes and activities from a manifest, like _extract_activities"""
+        self.project_title = manifest['title']
+        self.calendar_format = CalendarFormat(manifest['calendar_format'])
+        if manifest['start_date']:
+            self.start_date = datetime.date.fromisoformat(manifest['start_date'])
+        self.total_rows = len(manifest['activities'])
+        
+        current_section = None
+        for row, values in enumerate(manifest['activities'], start=1):
+            self.current_row = row
+            task, action_needed, duration, precursor, sequence, resources, budget, section = values
+            section = ActivitySection(section)
+            if section != current_section:
+                current_section = section
+                yield current_section
+            yield Activity(
+                task=task,
+                action_needed=action_needed,
+                duration=duration,
+                precursor=precursor,
+                sequence=sequence,
+                resources=resources,
+                budget=budget,
+                section=section
+            )
+    
+    def _read_merged_anchors(self) -> set:
+        """Collect the top-left (row, column) of every range merged across columns, in one pass"""
+        from openpyxl.utils.cell import range_boundaries
+        
+        merge_tag = '{%s}mergeCell' % SPREADSHEET_NS
+        anchors = set()
+        # Read-only worksheets do not expose merged cells, so read them from the sheet XML
+        with self.archive.open(_sheet_parts(self.archive)[self.worksheet.title]) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == merge_tag:
+                    min_col, min_row, max_col, _ = range_boundaries(element.get('ref'))
+                    if max_col > min_col:
+                        anchors.add((min_row, min_col))
+                element.clear()
+        return anchors
+    
+    def _extract_project_title(self, head_rows: List[tuple]) -> Optional[str]:
         """Extract project title from the Excel file (supports both old and new formats)"""
         # First check for old format: "Project Title: ..." in column 1
-        for row in range(1, 10):
-            cell = self.worksheet.cell(row=row, column=1)
-            if cell.value and isinstance(cell.value, str) and "Project Title:" in cell.value:
-                return cell.value.replace("Project Title:", "").strip()
+        for row_data in head_rows[:9]:
+            value = row_data[0]
+            if value and isinstance(value, str) and "Project Title:" in value:
+                return value.replace("Project Title:", "").strip()
         
         # Then check for new format: title is stored in column 3 (C) in the generated Excel files
-        for row in range(1, 10):
-            title_cell = self.worksheet.cell(row=row, column=3)
-            if title_cell.value and isinstance(title_cell.value, str) and title_cell.value.strip():
+        for row_data in head_rows[:9]:
+            value = row_data[2]
+            if value and isinstance(value, str) and value.strip():
                 # Skip if it's clearly a header row
-                if "Activities/Tasks" in title_cell.value or "S/No" in title_cell.value:
+                if "Activities/Tasks" in value or "S/No" in value:
                     continue
-                return title_cell.value.strip()
+                return value.strip()
         
         return None
     
@@ -1506,23 +1692,20 @@ class ExcelLoader:
         # Could be enhanced to detect from formulas in comments
         return CalendarFormat.SIX_DAY
     
-    def _extract_activities(self) -> List[Activity]:
-        """Extract activities from the Excel sheet"""
-        activities = []
+    def _extract_activities(self, head_rows: List[tuple], remaining_rows) -> Iterator[Union[ActivitySection, Activity]]:
+        """Extract section changes and activities from the Excel sheet, one row at a time"""
         current_section = None
-        header_row = None
         
         # Find the header row - support both new format (S/No) and old format (Activities/Tasks)
         header_row = None
         old_format = False
         
-        for row in range(1, 20):
-            cell = self.worksheet.cell(row=row, column=1)
-            if cell.value == "S/No":
+        for row, row_data in enumerate(head_rows, start=1):
+            if row_data[0] == "S/No":
                 header_row = row
                 old_format = False
                 break
-            elif cell.value == "Activities/Tasks":
+            elif row_data[0] == "Activities/Tasks":
                 header_row = row
                 old_format = True
                 break
@@ -1531,23 +1714,28 @@ class ExcelLoader:
             raise ValueError("Could not find header row with S/No or Activities/Tasks column")
         
         # Process rows after header
-        for row in range(header_row + 1, self.worksheet.max_row + 1):
-            row_data = self._get_row_data(row)
-            
+        body_rows = itertools.chain(
+            enumerate(head_rows[header_row:], start=header_row + 1),
+            enumerate(remaining_rows, start=len(head_rows) + 1)
+        )
+        for row, row_data in body_rows:
+            self.current_row = row
             if not any(row_data):  # Skip empty rows
                 continue
             
             # Check if this is a section header
-            if self._is_section_row(row):
-                section_name = self.worksheet.cell(row=row, column=1).value
+            if self._is_section_row(row, row_data):
+                section_name = row_data[0]
                 if "Pre-Kickoff" in section_name or "Pre Kickoff" in section_name:
                     current_section = ActivitySection.PRE_KICKOFF
+                    yield current_section
                 elif "Post Kick-off" in section_name or "Post Kickoff" in section_name:
                     current_section = ActivitySection.POST_KICKOFF
+                    yield current_section
                 continue
             
             # Check if this is the total row
-            if self._is_total_row(row):
+            if self._is_total_row(row_data):
                 break
             
             # Extract activity data
@@ -1595,40 +1783,93 @@ class ExcelLoader:
                         budget=budget,
                         section=current_section
                     )
-                    activities.append(activity)
+                    yield activity
                     
             except (ValueError, TypeError) as e:
                 # Skip rows with invalid data
                 continue
-        
-        return activities
     
-    def _get_row_data(self, row: int) -> List:
-        """Get all cell values from a row"""
-        return [self.worksheet.cell(row=row, column=col).value for col in range(1, 10)]
-    
-    def _is_section_row(self, row: int) -> bool:
+    def _is_section_row(self, row: int, row_data: tuple) -> bool:
         """Check if row is a section header"""
-        cell = self.worksheet.cell(row=row, column=1)
-        if not cell.value:
+        if not row_data[0]:
             return False
         
-        value = str(cell.value).lower()
+        value = str(row_data[0]).lower()
         return ("kickoff" in value or "kick-off" in value) and self._is_merged_across_columns(row, 1)
     
-    def _is_total_row(self, row: int) -> bool:
+    def _is_total_row(self, row_data: tuple) -> bool:
         """Check if row is the total budget row"""
         # Check if "Total:" appears in Resources column (column 8)
-        total_cell = self.worksheet.cell(row=row, column=8)
-        return total_cell.value and str(total_cell.value).strip().lower() == "total:"
+        total_value = row_data[7]
+        return total_value and str(total_value).strip().lower() == "total:"
     
     def _is_merged_across_columns(self, row: int, col: int) -> bool:
         """Check if cell is merged across multiple columns"""
-        cell = self.worksheet.cell(row=row, column=col)
-        for merged_range in self.worksheet.merged_cells.ranges:
-            if cell.coordinate in merged_range:
-                return True
-        return False
+        return (row, col) in self.merged_anchors
+
+
+class CsvPlanLoader:
+    """Loads an execution-plan CSV with the same interface as ExcelLoader"""
+    
+    def __init__(self, source, strict: bool = False):
+        # source is a file path or an iterable of text lines
+        self.source = source
+        self.strict = strict
+        self.reader = None
+        self.project_title = None
+        self.calendar_format = None
+        self.start_date = None
+        self.current_row = 0
+        self.total_rows = None
+        self.warnings = []
+    
+    def load_project(self) -> Optional[Project]:
+        """Load project data from the CSV file"""
+        activities = [item for item in self.iter_activities() if isinstance(item, Activity)]
+        return Project(
+            title=self.project_title,
+            calendar_format=self.calendar_format,
+            activities=activities
+        )
+    
+    def iter_activities(self) -> Iterator[Union[ActivitySection, Activity]]:
+        """Stream the plan like ExcelLoader.iter_activities. CSV plans carry no calendar
+        format or start date, so calendar_format is the 6-day default ExcelLoader also uses."""
+        is_path = isinstance(self.source, str)
+        lines = open(self.source, 'r', encoding='utf-8-sig', newline='') if is_path else self.source
+        try:
+            self.reader = PlanCsvReader(lines, strict=self.strict)
+            self.warnings = self.reader.warnings
+            self.calendar_format = CalendarFormat.SIX_DAY
+            
+            current_section = None
+            for row in self.reader:
+                self.current_row = row.line
+                self.project_title = self._title()
+                section = ActivitySection(row.section)
+                if section != current_section:
+                    current_section = section
+                    yield current_section
+                yield Activity(
+                    task=row.task,
+                    action_needed=row.action_needed,
+                    duration=row.duration,
+                    precursor=row.precursor,
+                    sequence=row.sequence,
+                    resources=row.resources,
+                    budget=row.budget,
+                    section=section
+                )
+            self.project_title = self._title()
+        finally:
+            if is_path:
+                lines.close()
+    
+    def _title(self) -> Optional[str]:
+        """Title row of the plan, or the file name when it has none"""
+        if self.reader.title or not isinstance(self.source, str):
+            return self.reader.title
+        return os.path.splitext(os.path.basename(self.source))[0]
 
 
 class ProjectSchedulerGUI:
@@ -2504,11 +2745,12 @@ class ProjectSchedulerGUI:
         self.root.mainloop()
 
     def load_excel(self):
-        """Load an existing Excel file generated by the scheduler"""
+        """Load an existing Excel file generated by the scheduler, or an execution-plan CSV"""
         file_path = filedialog.askopenfilename(
             title="Load Project Excel File",
             filetypes=[
                 ("Excel files", "*.xlsx"),
+                ("Execution plan CSV", "*.csv"),
                 ("All files", "*.*")
             ],
             initialdir=os.getcwd()
@@ -2517,6 +2759,8 @@ class ProjectSchedulerGUI:
         if not file_path:
             return
         
+        is_csv = file_path.lower().endswith('.csv')
+        started = False
         try:
             # Show loading progress
             progress_window = tk.Toplevel(self.root)
@@ -2536,19 +2780,23 @@ class ProjectSchedulerGUI:
             
             progress_window.update()
             
-            # Load the Excel file
-            loader = ExcelLoader(file_path)
-            project = loader.load_project()
-            
-            # Clear existing data
-            self.clear_all_data()
+            # Stream the file, showing activities as they are parsed
+            loader = CsvPlanLoader(file_path) if is_csv else ExcelLoader(file_path)
             
-            # Load project data into GUI
-            self.project_title_var.set(project.title)
-            self.calendar_format_var.set(project.calendar_format.value)
-            
-            # Load activities
-            for activity in project.activities:
+            for item in loader.iter_activities():
+                if not started:
+                    # Title and calendar format are known once the first item arrives
+                    self.clear_all_data()
+                    self.project_title_var.set(loader.project_title)
+                    self.calendar_format_var.set(loader.calendar_format.value)
+                    if loader.start_date:
+                        self.start_date_var.set(loader.start_date.strftime("%Y-%m-%d"))
+                    started = True
+                
+                if not isinstance(item, Activity):
+                    continue  # Section change
+                
+                activity = item
                 self.activities_data.append(activity)
                 
                 # Add to treeview (show budget in millions)
@@ -2563,6 +2811,21 @@ class ProjectSchedulerGUI:
                     activity.resources, 
                     f"{budget_millions:.2f}"
                 ))
+                
+                # Refresh the progress window every few rows so the UI stays responsive
+                if len(self.activities_data) % 50 == 0:
+                    total = f" of {loader.total_rows}" if loader.total_rows else ""
+                    progress_label.config(text=f"Loading Excel file... row {loader.current_row}{total}")
+                    self.update_activities_count()
+                    progress_window.update()
+            
+            if not started:
+                # Empty schedule: still load the title and calendar format
+                self.clear_all_data()
+                self.project_title_var.set(loader.project_title)
+                self.calendar_format_var.set(loader.calendar_format.value)
+                if loader.start_date:
+                    self.start_date_var.set(loader.start_date.strftime("%Y-%m-%d"))
             
             # Update activities count
             self.update_activities_count()
@@ -2570,13 +2833,20 @@ class ProjectSchedulerGUI:
             # Close progress window
             progress_window.destroy()
             
+            # Unreadable numbers in a CSV plan were loaded as 0; point at the first one
+            warning_text = ""
+            if is_csv and loader.warnings:
+                warning_text = (f"{len(loader.warnings)} value(s) could not be read and were set to 0, "
+                                f"first at {loader.warnings[0]}\n\n")
+            
             # Show success message
             messagebox.showinfo(
                 "Load Successful", 
                 f"Successfully loaded project:\n\n"
-                f"Title: {project.title}\n"
-                f"Activities: {len(project.activities)}\n"
-                f"Calendar Format: {project.calendar_format.value}\n\n"
+                f"Title: {loader.project_title}\n"
+                f"Activities: {len(self.activities_data)}\n"
+                f"Calendar Format: {loader.calendar_format.value}\n\n"
+                f"{warning_text}"
                 f"You can now edit activities or add new ones!"
             )
             
@@ -2587,10 +2857,18 @@ class ProjectSchedulerGUI:
             except:
                 pass
             
+            # Don't leave a partially loaded schedule behind
+            if started:
+                self.clear_all_data()
+            
+            if is_csv:
+                hint = "Please ensure the file is an execution plan with an S/N header row."
+            else:
+                hint = "Please ensure the file was generated by this scheduler program."
             messagebox.showerror(
                 "Load Error", 
-                f"Failed to load Excel file:\n\n{str(e)}\n\n"
-                f"Please ensure the file was generated by this scheduler program."
+                f"Failed to load {'CSV' if is_csv else 'Excel'} file:\n\n{str(e)}\n\n"
+                f"{hint}"
             )
     
     def clear_all_data(self):
@@ -21,7 +21,18 @@ from openpyxl.utils import get_column_letter
 import os
 import sys
 import datetime
-from typing import Union
+import itertools
+import base64
+import hashlib
+import json
+import posixpath
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from typing import Iterator, Union
+from plan_csv import PlanCsvReader
+# Cache versions of the workbook and Gantt output; bump them in versions.py
+from versions import GENERATOR_VERSION, GANTT_VERSION  # noqa: F401
 
 
 def get_resource_path(relative_path):
@@ -34,6 +45,31 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# Defaults for deterministic exports when no timestamp/author is injected
+DETERMINISTIC_TIMESTAMP = datetime.datetime(2000, 1, 1)
+DETERMINISTIC_AUTHOR = "Project Scheduler"
+# Earliest date a zip entry can carry
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Every workbook carries a very hidden sheet with a compressed JSON copy of the project,
+# so ExcelLoader can reload our own exports without scanning the formatted cells
+MANIFEST_SHEET = "_manifest"
+MANIFEST_MARKER = "psp-manifest"
+MANIFEST_SCHEMA_VERSION = 2
+# Excel caps a cell at 32767 characters
+MANIFEST_CHUNK_SIZE = 32000
+
+
+def resolve_logo_path(custom_logo_path: Optional[str] = None) -> Optional[str]:
+    """Return the logo file ExcelGenerator will embed, or None if there is none"""
+    if custom_logo_path and os.path.exists(custom_logo_path):
+        return custom_logo_path
+    default_path = get_resource_path("IESL-Logo.png")
+    if os.path.exists(default_path):
+        return default_path
+    return None
+
+
 class CalendarFormat(Enum):
     FIVE_DAY = "5-day week"
     SIX_DAY = "6-day week"
@@ -86,6 +122,32 @@ class Project:
         return sorted(sequences)
 
 
+class ExportProfile(Enum):
+    FULL = "full"
+    FAST = "fast"
+    DATA_ONLY = "data-only"
+    LIVE = "live"
+
+
+@dataclass(frozen=True)
+class ExportFeatures:
+    """Optional workbook decorations, the expensive parts of an export"""
+    schedule_comments: bool = True  # Formula comment on every post-kickoff schedule cell (VML drawings)
+    gantt_formulas: bool = True     # Formula behind every cell of the Gantt timeline
+    sheet_protection: bool = True
+    logo: bool = True
+    live_formulas: bool = False     # Schedule, budget total and Gantt dates as Excel formulas
+
+
+EXPORT_PROFILES = {
+    ExportProfile.FULL: ExportFeatures(),
+    ExportProfile.FAST: ExportFeatures(schedule_comments=False, gantt_formulas=False),
+    ExportProfile.DATA_ONLY: ExportFeatures(schedule_comments=False, gantt_formulas=False,
+                                            sheet_protection=False, logo=False),
+    ExportProfile.LIVE: ExportFeatures(live_formulas=True),
+}
+
+
 class ScheduleCalculator:
     """Handles schedule calculations and calendar adjustments"""
 
@@ -131,6 +193,16 @@ class ScheduleCalculator:
         else:  # SEVEN_DAY
             return schedule_days
 
+    @staticmethod
+    def calendar_format_formula(schedule_days: str, calendar_format: CalendarFormat) -> str:
+        """Excel expression equivalent to apply_calendar_format for a cell reference or expression"""
+        if calendar_format == CalendarFormat.FIVE_DAY:
+            return f"{schedule_days}+INT({schedule_days}/5)*2"
+        elif calendar_format == CalendarFormat.SIX_DAY:
+            return f"{schedule_days}+INT({schedule_days}/6)"
+        else:  # SEVEN_DAY
+            return schedule_days
+
     @staticmethod
     def get_max_duration_activities(project: Project) -> List[Tuple[Activity, int]]:
         """Get activities that have max duration within their sequence group"""
@@ -151,15 +223,56 @@ class ScheduleCalculator:
         return max_duration_activities
 
 
+# Namespaces of the package relationships and workbook parts of an .xlsx archive
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _sheet_parts(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Zip member name of each sheet of an .xlsx archive by sheet name, resolved through
+    the workbook part and its relationships"""
+    def relationships(rels_part):
+        root = ElementTree.fromstring(archive.read(rels_part))
+        return {rel.get('Id'): (rel.get('Type'), rel.get('Target'))
+                for rel in root.iter('{%s}Relationship' % PACKAGE_RELATIONSHIPS_NS)}
+
+    def resolve(source_part, target):
+        if target.startswith('/'):
+            return target[1:]
+        return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+    workbook_part = next(resolve('', target) for rel_type, target in relationships('_rels/.rels').values()
+                         if rel_type.endswith('/officeDocument'))
+    directory, name = posixpath.split(workbook_part)
+    targets = relationships(posixpath.join(directory, '_rels', name + '.rels'))
+    workbook = ElementTree.fromstring(archive.read(workbook_part))
+    return {sheet.get('name'): resolve(workbook_part, targets[sheet.get('{%s}id' % OFFICE_RELATIONSHIPS_NS)][1])
+            for sheet in workbook.iter('{%s}sheet' % SPREADSHEET_NS)}
+
+
 class ExcelGenerator:
     """Generates Excel files with proper formatting and calculations"""
 
-    def __init__(self, project: Project, custom_logo_path: Optional[str] = None):
+    def __init__(self, project: Project, custom_logo_path: Optional[str] = None, deterministic: bool = False,
+                 generated_at: Optional[datetime.datetime] = None, author: Optional[str] = None,
+                 profile: ExportProfile = ExportProfile.FULL):
         self.project = project
         self.custom_logo_path = custom_logo_path
+        self.profile = profile
+        self.features = EXPORT_PROFILES[profile]
+        # Deterministic mode produces identical bytes for identical input: fixed (or injected)
+        # timestamp and author, fixed document properties, stable zip entry order and dates
+        self.deterministic = deterministic
+        self.generated_at = generated_at
+        self.author = author
         self.workbook = openpyxl.Workbook()
         self.worksheet = self.workbook.active
         self.worksheet.title = "Project Schedule"
+        # Row of each activity and the cell holding the working days before its sequence
+        # starts (None for the first sequence), used by live formulas on the Gantt sheet
+        self.schedule_refs: Dict[int, Tuple[int, Optional[str]]] = {}
+        self.data_start_row = None
 
         # Styling constants
         self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
@@ -174,8 +287,8 @@ class ExcelGenerator:
             bottom=Side(style='thin')
         )
 
-    def generate(self, output_path: str):
-        """Generate the complete Excel file"""
+    def generate(self, output_path):
+        """Generate the complete Excel file (output_path may also be a writable binary file object)"""
         current_row = 1
 
         # Add formatted header (project title, logo space, and timestamp)
@@ -184,6 +297,7 @@ class ExcelGenerator:
 
         # Add column headers
         current_row = self._add_styled_headers(current_row)
+        self.data_start_row = current_row
 
         # Add Pre-Kickoff Activities section
         current_row = self._add_section(ActivitySection.PRE_KICKOFF, current_row)
@@ -199,7 +313,8 @@ class ExcelGenerator:
         self._apply_formatting()
 
         # Apply sheet protection (allow editing only for Review Comments column)
-        self._apply_sheet_protection()
+        if self.features.sheet_protection:
+            self._apply_sheet_protection()
 
         # Remove gridlines outside content area
         self._remove_external_gridlines()
@@ -211,11 +326,102 @@ class ExcelGenerator:
         # self._generate_charts(current_row)
 
         # Generate Gantt chart as second worksheet
-        gantt_generator = GanttChartGenerator(self.project, self.workbook)
+        default_start_date = self._get_timestamp().date() if self.deterministic else None
+        gantt_generator = GanttChartGenerator(self.project, self.workbook, default_start_date=default_start_date,
+                                              features=self.features, schedule_refs=self.schedule_refs)
         gantt_generator.generate_gantt_chart()
 
+        # Embed the machine-readable copy of the project used for reloading
+        self._add_manifest()
+
         # Save file
+        if self.deterministic:
+            self._save_deterministic(output_path)
+        else:
+            self._save_workbook(output_path)
+
+    def _get_timestamp(self) -> datetime.datetime:
+        """Timestamp stamped into the sheet and document properties"""
+        if self.generated_at:
+            return self.generated_at
+        if self.deterministic:
+            return DETERMINISTIC_TIMESTAMP
+        return datetime.datetime.now()
+
+    def _get_author(self) -> str:
+        """User name stamped into the sheet and document properties"""
+        if self.author:
+            return self.author
+        if self.deterministic:
+            return DETERMINISTIC_AUTHOR
+
+        import getpass
+        try:
+            return getpass.getuser()
+        except:
+            return os.environ.get('USERNAME', os.environ.get('USER', 'Unknown User'))
+
+    def _save_deterministic(self, output_path):
+        """Save the workbook so identical input always produces identical bytes"""
+        import io
+        from openpyxl.xml.functions import tostring
+
+        timestamp = self._get_timestamp()
+        author = self._get_author()
+        properties = self.workbook.properties
+        properties.creator = author
+        properties.lastModifiedBy = author
+        properties.created = timestamp
+
+        buffer = io.BytesIO()
+        self._save_workbook(buffer)
+
+        # openpyxl stamps the current time as the modified date while saving, so rewrite core.xml
+        properties.modified = timestamp
+        core_xml = tostring(properties.to_tree())
+
+        with zipfile.ZipFile(buffer) as source:
+            # [Content_Types].xml first, everything else by name
+            names = sorted(source.namelist(), key=lambda name: (name != "[Content_Types].xml", name))
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as target:
+                target.comment = source.comment
+                for name in names:
+                    data = core_xml if name == "docProps/core.xml" else source.read(name)
+                    info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o600 << 16
+                    target.writestr(info, data)
+
+    def _add_manifest(self):
+        """Add a very hidden sheet holding the project as compressed JSON with a checksum"""
+        project = self.project
+        payload = {
+            'title': project.title,
+            'calendar_format': project.calendar_format.value,
+            'start_date': project.start_date.isoformat() if project.start_date else None,
+            'activities': [
+                [a.task, a.action_needed, a.duration, a.precursor, a.sequence, a.resources, a.budget, a.section.value]
+                for a in project.activities
+            ],
+        }
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        encoded = base64.b64encode(zlib.compress(data, 9)).decode('ascii')
+
+        ws = self.workbook.create_sheet(MANIFEST_SHEET)
+        ws.sheet_state = 'veryHidden'
+        ws.append([MANIFEST_MARKER, MANIFEST_SCHEMA_VERSION, hashlib.sha256(data).hexdigest()])
+        for offset in range(0, len(encoded), MANIFEST_CHUNK_SIZE):
+            ws.append([encoded[offset:offset + MANIFEST_CHUNK_SIZE]])
+
+    def _save_workbook(self, output_path):
+        """Save the workbook, then stamp the schedule sheet's part name and zip CRC into the
+        archive comment. Saving anywhere else drops the comment and rewrites the sheet, so
+        ExcelLoader only trusts the manifest while the stamp still matches."""
         self.workbook.save(output_path)
+        with zipfile.ZipFile(output_path, 'a') as archive:
+            schedule_part = _sheet_parts(archive)[self.workbook.worksheets[0].title]
+            stamp = f"{MANIFEST_MARKER} {schedule_part} {archive.getinfo(schedule_part).CRC}"
+            archive.comment = stamp.encode('ascii')
 
     def _add_formatted_header(self, start_row: int) -> int:
         """Add formatted header with logo space, project title, and timestamp"""
@@ -263,23 +469,21 @@ class ExcelGenerator:
     def _add_logo_and_timestamp(self, start_row: int):
         """Add logo and timestamp to the merged A-B cell"""
         import os
-        import datetime
-        import getpass
         
         # Get user account name
-        try:
-            user_account = getpass.getuser()
-        except:
-            user_account = os.environ.get('USERNAME', os.environ.get('USER', 'Unknown User'))
+        user_account = self._get_author()
         
         # Add timestamp text to the merged cell with new format
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self._get_timestamp().strftime("%Y-%m-%d %H:%M:%S")
         timestamp_text = f"Generated by: {user_account}\n{timestamp}"
         
         timestamp_cell = self.worksheet.cell(row=start_row, column=1, value=timestamp_text)
         timestamp_cell.font = Font(size=9, bold=False)
         timestamp_cell.alignment = Alignment(horizontal='center', vertical='bottom', wrap_text=True)
         
+        if not self.features.logo:
+            return
+        
         # Use custom logo if provided, otherwise use default
         if self.custom_logo_path and os.path.exists(self.custom_logo_path):
             logo_path = self.custom_logo_path
@@ -436,14 +640,47 @@ class ExcelGenerator:
         activity_number = 1
         for activity in activities:
             self._add_activity_row(activity, current_row, schedules, max_duration_set, activity_number)
+            self.schedule_refs[id(activity)] = (current_row, None)
             current_row += 1
             activity_number += 1
 
+        # Replace computed schedule values with formulas Excel recalculates
+        if self.features.live_formulas and section == ActivitySection.POST_KICKOFF and activities:
+            self._add_live_schedule_formulas(activities, start_row + 1, current_row - 1)
+
         # Merge cells for same sequences
         self._merge_schedule_cells(section, start_row + 1, current_row - 1)
 
         return current_row
 
+    def _add_live_schedule_formulas(self, activities: List[Activity], first_row: int, last_row: int):
+        """Write post-kickoff schedules as formulas over the Duration and Sequence columns.
+        Hidden column L keeps the cumulative working days at the end of each sequence."""
+        duration_range = f"$D${first_row}:$D${last_row}"
+        sequence_range = f"$F${first_row}:$F${last_row}"
+        previous_end_row = None
+        start_ref = None
+
+        for offset, activity in enumerate(activities):
+            row = first_row + offset
+            if offset == 0 or activity.sequence != activities[offset - 1].sequence:
+                # First row of a sequence holds the merged schedule cell: previous end + longest duration
+                max_duration = f"_xlfn.MAXIFS({duration_range},{sequence_range},F{row})"
+                end_formula = f"L{previous_end_row}+{max_duration}" if previous_end_row else max_duration
+                self.worksheet.cell(row=row, column=12, value=f"={end_formula}")
+                schedule_formula = ScheduleCalculator.calendar_format_formula(f"L{row}", self.project.calendar_format)
+                self.worksheet.cell(row=row, column=7, value=f"={schedule_formula}")
+
+                start_ref = f"$L${previous_end_row}" if previous_end_row else None
+                previous_end_row = row
+            self.schedule_refs[id(activity)] = (row, start_ref)
+
+        header_cell = self.worksheet.cell(row=self.data_start_row - 1, column=12, value="Working days (cumulative)")
+        header_cell.font = Font(size=11, bold=True)
+        self.worksheet.column_dimensions['L'].hidden = True
+        # Formulas carry no cached values, so have Excel compute everything on open
+        self.workbook.calculation.fullCalcOnLoad = True
+
     def _add_empty_row(self, start_row: int) -> int:
         """Add an empty row with merged columns (excluding Review Comments column)"""
         # Merge columns A to I only (not affecting Review Comments column K)
@@ -559,7 +796,7 @@ class ExcelGenerator:
                 cell.font = Font(color="FF0000", bold=True, size=10)  # Red text, bold
         
         # Add formula to schedule cell (column 7) if it's not pre-kickoff
-        if activity.section != ActivitySection.PRE_KICKOFF:
+        if activity.section != ActivitySection.PRE_KICKOFF and self.features.schedule_comments:
             schedule_cell = self.worksheet.cell(row=row, column=7)
             # Add comment with formula explanation
             from openpyxl.comments import Comment
@@ -602,7 +839,10 @@ class ExcelGenerator:
         total_cell.border = self.border
         
         # Calculate total budget in millions
-        total_budget_millions = sum(activity.budget for activity in self.project.activities) / 1000000
+        if self.features.live_formulas:
+            total_budget_millions = f"=SUM(I{self.data_start_row}:I{start_row - 1})"
+        else:
+            total_budget_millions = sum(activity.budget for activity in self.project.activities) / 1000000
         budget_cell = self.worksheet.cell(row=current_row, column=9, value=total_budget_millions)
         budget_cell.font = Font(bold=True)
         budget_cell.fill = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")
@@ -648,7 +888,8 @@ class ExcelGenerator:
                         cell.border = self.border
 
     def _apply_sheet_protection(self):
-        """Apply sheet protection, leaving only Review Comments column unlocked"""
+        """Apply sheet protection, leaving the Review Comments column (and, in live
+        workbooks, the activities' Duration and Sequence) unlocked"""
         from openpyxl.styles import Protection
         
         # Lock all cells by default
@@ -663,7 +904,14 @@ class ExcelGenerator:
                 # Only unlock data rows (skip headers and section headers)
                 if cell.row > 3:  # Assuming headers start around row 3
                     cell.protection = Protection(locked=False)
-        
+
+        # Live workbooks recalculate from Duration (D) and Sequence (F), so those stay
+        # editable on every activity row; the schedule formulas themselves stay locked
+        if self.features.live_formulas:
+            for row, _ in self.schedule_refs.values():
+                for column in (4, 6):
+                    self.worksheet.cell(row=row, column=column).protection = Protection(locked=False)
+
         # Protect the worksheet with a password (optional)
         # You can change or remove the password as needed
         self.worksheet.protection.sheet = True
@@ -1003,11 +1251,19 @@ class ExcelGenerator:
 
 
 class GanttChartGenerator:
-    """Generates Gantt chart worksheet based on Agile Gantt chart template"""
+    """Generates Gantt chart worksheet based on Agile Gantt chart template.
+    Changes to its scheduling need a GANTT_VERSION bump (see versions.py)."""
     
-    def __init__(self, project: Project, workbook: openpyxl.Workbook):
+    def __init__(self, project: Project, workbook: openpyxl.Workbook, default_start_date: Optional[datetime.date] = None,
+                 features: Optional[ExportFeatures] = None,
+                 schedule_refs: Optional[Dict[int, Tuple[int, Optional[str]]]] = None):
         self.project = project
         self.workbook = workbook
+        self.features = features or ExportFeatures()
+        # Where each activity lives on the schedule sheet (see ExcelGenerator.schedule_refs)
+        self.schedule_refs = schedule_refs or {}
+        # Used instead of today's date when the project has no start date
+        self.default_start_date = default_start_date
         
         # Create Gantt chart worksheet
         self.gantt_worksheet = self.workbook.create_sheet("Gantt Chart")
@@ -1030,7 +1286,7 @@ class GanttChartGenerator:
         """Generate the complete Gantt chart worksheet"""
         # Calculate project timeline and dates
         # Use project's start date if available, otherwise default to today
-        project_start_date = self.project.start_date if self.project.start_date else datetime.date.today()
+        project_start_date = self.project.start_date or self.default_start_date or datetime.date.today()
         timeline_data = self._calculate_timeline_data(project_start_date)
         
         # Set up worksheet structure
@@ -1043,7 +1299,8 @@ class GanttChartGenerator:
         self._add_task_data(timeline_data)
         
         # Apply Gantt visualization formulas
-        self._apply_gantt_formulas(timeline_data)
+        if self.features.gantt_formulas:
+            self._apply_gantt_formulas(timeline_data)
         
         # Apply direct cell styling instead of conditional formatting to prevent corruption
         self._apply_direct_gantt_styling(timeline_data)
@@ -1307,6 +1564,10 @@ class GanttChartGenerator:
             # Column G: Duration
             ws.cell(row=row, column=7, value=activity.duration)
             
+            # Live workbooks derive dates and durations from the schedule sheet
+            if self.features.live_formulas and id(activity) in self.schedule_refs:
+                self._add_live_task_formulas(row, activity)
+            
             # Apply basic formatting
             for col in range(1, 8):
                 cell = ws.cell(row=row, column=col)
@@ -1315,6 +1576,31 @@ class GanttChartGenerator:
                     cell.alignment = Alignment(horizontal='center', vertical='center')
                     cell.font = Font(size=9)
     
+    def _add_live_task_formulas(self, row: int, activity: Activity) -> None:
+        """Point a task's start, due date and duration at the schedule sheet"""
+        ws = self.gantt_worksheet
+        schedule_row, start_ref = self.schedule_refs[id(activity)]
+        duration_ref = f"'Project Schedule'!$D${schedule_row}"
+        calendar_format = self.project.calendar_format
+        
+        if activity.section == ActivitySection.PRE_KICKOFF:
+            # Ends at the project start and runs backwards
+            start_offset = ScheduleCalculator.calendar_format_formula(f"(-{duration_ref})", calendar_format)
+            ws.cell(row=row, column=5, value="=$F$5")
+            ws.cell(row=row, column=6, value=f"=$F$5+{start_offset}")
+        else:
+            # Starts where the previous sequence ends (the project start for the first one)
+            if start_ref:
+                start_days = f"'Project Schedule'!{start_ref}"
+                start_offset = ScheduleCalculator.calendar_format_formula(start_days, calendar_format)
+                end_offset = ScheduleCalculator.calendar_format_formula(f"({start_days}+{duration_ref})", calendar_format)
+                ws.cell(row=row, column=6, value=f"=$F$5+{start_offset}")
+            else:
+                end_offset = ScheduleCalculator.calendar_format_formula(duration_ref, calendar_format)
+                ws.cell(row=row, column=6, value="=$F$5")
+            ws.cell(row=row, column=5, value=f"=$F$5+{end_offset}")
+        ws.cell(row=row, column=7, value=f"={duration_ref}")
+    
     def _apply_gantt_formulas(self, timeline_data: Dict) -> None:
         """Apply Gantt visualization formulas like Agile Gantt chart"""
         ws = self.gantt_worksheet
@@ -1384,50 +1670,36 @@ class GanttChartGenerator:
         print(f"Applying direct styling to range: I10 to {get_column_letter(timeline_end_col_num)}{timeline_end_row}")
         
         try:
-            # Apply styling directly to cells based on their calculated values
-            for row in range(10, timeline_end_row + 1):
-                for col in range(timeline_start_col_num, timeline_end_col_num + 1):
-                    cell = ws.cell(row=row, column=col)
+            # Style only the cells covered by each task's bar, so the result does not
+            # depend on the timeline formulas being present
+            timeline_start = timeline_data['timeline_start']
+            for task_index, task_data in enumerate(timeline_data['task_timeline']):
+                row = 10 + task_index
+                
+                # Determine the color based on task type and criticality
+                if task_data['is_critical']:
+                    if task_data['task_type'] == "Goal":
+                        color_value = 4  # Critical goal - red
+                    else:
+                        color_value = 3  # Critical milestone - dark red
+                else:
+                    if task_data['task_type'] == "Goal":
+                        color_value = 2  # Regular goal - blue
+                    else:
+                        color_value = 1  # Regular milestone - green
+                
+                first_index = (task_data['start_date'] - timeline_start).days
+                for date_index in range(max(first_index, 0), first_index + task_data['duration']):
+                    col = timeline_start_col_num + date_index
+                    if col > timeline_end_col_num:
+                        break
                     
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                        # Evaluate the formula to get the expected result
-                        try:
-                            # Get task data for this row
-                            task_index = row - 10
-                            if task_index < len(timeline_data['task_timeline']):
-                                task_data = timeline_data['task_timeline'][task_index]
-                                
-                                # Get the date for this column
-                                date_index = col - timeline_start_col_num
-                                if date_index < len(timeline_data['date_timeline']):
-                                    current_date = timeline_data['date_timeline'][date_index]
-                                    task_start_date = task_data['start_date']
-                                    task_end_date = task_start_date + datetime.timedelta(days=task_data['duration'] - 1)
-                                    
-                                    # Check if this date falls within the task duration
-                                    if task_start_date <= current_date <= task_end_date:
-                                        # Determine the color based on task type and criticality
-                                        if task_data['is_critical']:
-                                            if task_data['task_type'] == "Goal":
-                                                color_value = 4  # Critical goal - red
-                                            else:
-                                                color_value = 3  # Critical milestone - dark red
-                                        else:
-                                            if task_data['task_type'] == "Goal":
-                                                color_value = 2  # Regular goal - blue
-                                            else:
-                                                color_value = 1  # Regular milestone - green
-                                        
-                                        # Apply the color
-                                        if color_value in color_map:
-                                            cell.fill = color_map[color_value]
-                                            # Make font invisible by setting it to white
-                                            cell.font = Font(color="FFFFFF", size=1)
-                                            # Keep the number format to hide values
-                                            cell.number_format = ';;;"";'
-                        except Exception as cell_error:
-                            # Skip problematic cells
-                            pass
+                    cell = ws.cell(row=row, column=col)
+                    cell.fill = color_map[color_value]
+                    # Make font invisible by setting it to white
+                    cell.font = Font(color="FFFFFF", size=1)
+                    # Keep the number format to hide values
+                    cell.number_format = ';;;"";'
             
             print("Direct Gantt styling applied successfully")
             
@@ -1462,51 +1734,157 @@ class ExcelLoader:
     
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self.archive = None
         self.workbook = None
         self.worksheet = None
+        self.merged_anchors = set()
+        self.project_title = None
+        self.calendar_format = None
+        self.start_date = None
+        self.current_row = 0
+        self.total_rows = None
     
     def load_project(self) -> Optional[Project]:
         """Load project data from Excel file"""
         try:
-            self.workbook = openpyxl.load_workbook(self.file_path)
-            self.worksheet = self.workbook.active
-            
-            # Extract project data
-            project_title = self._extract_project_title()
-            calendar_format = self._extract_calendar_format()
-            activities = self._extract_activities()
-            
-            if not project_title:
-                raise ValueError("Could not find project title in the Excel file")
+            activities = [item for item in self.iter_activities() if isinstance(item, Activity)]
             
             return Project(
-                title=project_title,
-                calendar_format=calendar_format,
-                activities=activities
+                title=self.project_title,
+                calendar_format=self.calendar_format,
+                activities=activities,
+                start_date=self.start_date
             )
             
         except Exception as e:
             raise Exception(f"Error loading Excel file: {str(e)}")
+    
+    def iter_activities(self) -> Iterator[Union[ActivitySection, Activity]]:
+        """Stream the schedule as it is parsed: yields the ActivitySection each time a new
+        section starts, then an Activity per task row. project_title and calendar_format
+        are set before the first item; current_row and total_rows track progress.
+        Workbooks with an intact manifest are read from it without scanning the sheet."""
+        try:
+            # Read-only mode streams rows straight from the sheet XML instead of building every cell
+            self.archive = zipfile.ZipFile(self.file_path)
+            self.workbook = openpyxl.load_workbook(self.file_path, read_only=True)
+            self.worksheet = self.workbook.active
+            
+            manifest = self._read_manifest()
+            if manifest:
+                yield from self._manifest_activities(manifest)
+                return
+            
+            self.total_rows = self.worksheet.max_row
+            self.merged_anchors = self._read_merged_anchors()
+            
+            rows = self.worksheet.iter_rows(min_row=1, max_col=9, values_only=True)
+            head_rows = list(itertools.islice(rows, 19))
+            
+            # Extract project data
+            self.project_title = self._extract_project_title(head_rows)
+            if not self.project_title:
+                raise ValueError("Could not find project title in the Excel file")
+            self.calendar_format = self._extract_calendar_format()
+            
+            yield from self._extract_activities(head_rows, rows)
+            
         finally:
             if self.workbook:
                 self.workbook.close()
+            if self.archive:
+                self.archive.close()
     
-    def _extract_project_title(self) -> Optional[str]:
+    def _read_manifest(self) -> Optional[dict]:
+        """Return the embedded project manifest, or None if it is missing, damaged or stale"""
+        if MANIFEST_SHEET not in self.workbook.sheetnames:
+            return None
+        
+        rows = self.workbook[MANIFEST_SHEET].iter_rows(max_col=3, values_only=True)
+        header = next(rows, None)
+        if not header or header[0] != MANIFEST_MARKER or header[1] != MANIFEST_SCHEMA_VERSION:
+            return None
+        checksum = header[2]
+        
+        # Saving the workbook anywhere else drops the stamp and rewrites the schedule sheet
+        marker, _, stamp = self.archive.comment.decode('ascii', 'replace').partition(' ')
+        schedule_part, _, schedule_crc = stamp.rpartition(' ')
+        if marker != MANIFEST_MARKER:
+            return None
+        try:
+            if self.archive.getinfo(schedule_part).CRC != int(schedule_crc):
+                return None
+        except (KeyError, ValueError):
+            return None
+        
+        encoded = "".join(row[0] for row in rows if row[0])
+        try:
+            data = zlib.decompress(base64.b64decode(encoded))
+        except (ValueError, zlib.error):
+            return None
+        if hashlib.sha256(data).hexdigest() != checksum:
+            return None
+        return json.loads(data)
+    
+    def _manifest_activities(self, manifest: dict) -> Iterator[Union[ActivitySection, Activity]]:
+        """Yield section changes and activities from a manifest, like _extract_activities"""
+        self.project_title = manifest['title']
+        self.calendar_format = CalendarFormat(manifest['calendar_format'])
+        if manifest['start_date']:
+            self.start_date = datetime.date.fromisoformat(manifest['start_date'])
+        self.total_rows = len(manifest['activities'])
+        
+        current_section = None
+        for row, values in enumerate(manifest['activities'], start=1):
+            self.current_row = row
+            task, action_needed, duration, precursor, sequence, resources, budget, section = values
+            section = ActivitySection(section)
+            if section != current_section:
+                current_section = section
+                yield current_section
+            yield Activity(
+                task=task,
+                action_needed=action_needed,
+                duration=duration,
+                precursor=precursor,
+                sequence=sequence,
+                resources=resources,
+                budget=budget,
+                section=section
+            )
+    
+    def _read_merged_anchors(self) -> set:
+        """Collect the top-left (row, column) of every range merged across columns, in one pass"""
+        from openpyxl.utils.cell import range_boundaries
+        
+        merge_tag = '{%s}mergeCell' % SPREADSHEET_NS
+        anchors = set()
+        # Read-only worksheets do not expose merged cells, so read them from the sheet XML
+        with self.archive.open(_sheet_parts(self.archive)[self.worksheet.title]) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == merge_tag:
+                    min_col, min_row, max_col, _ = range_boundaries(element.get('ref'))
+                    if max_col > min_col:
+                        anchors.add((min_row, min_col))
+                element.clear()
+        return anchors
+    
+    def _extract_project_title(self, head_rows: List[tuple]) -> Optional[str]:
         """Extract project title from the Excel file (supports both old and new formats)"""
         # First check for old format: "Project Title: ..." in column 1
-        for row in range(1, 10):
-            cell = self.worksheet.cell(row=row, column=1)
-            if cell.value and isinstance(cell.value, str) and "Project Title:" in cell.value:
-                return cell.value.replace("Project Title:", "").strip()
+        for row_data in head_rows[:9]:
+            value = row_data[0]
+            if value and isinstance(value, str) and "Project Title:" in value:
+                return value.replace("Project Title:", "").strip()
         
         # Then check for new format: title is stored in column 3 (C) in the generated Excel files
-        for row in range(1, 10):
-            title_cell = self.worksheet.cell(row=row, column=3)
-            if title_cell.value and isinstance(title_cell.value, str) and title_cell.value.strip():
+        for row_data in head_rows[:9]:
+            value = row_data[2]
+            if value and isinstance(value, str) and value.strip():
                 # Skip if it's clearly a header row
-                if "Activities/Tasks" in title_cell.value or "S/No" in title_cell.value:
+                if "Activities/Tasks" in value or "S/No" in value:
                     continue
-                return title_cell.value.strip()
+                return value.strip()
         
         return None
     
@@ -1516,23 +1894,20 @@ class ExcelLoader:
         # Could be enhanced to detect from formulas in comments
         return CalendarFormat.SIX_DAY
     
-    def _extract_activities(self) -> List[Activity]:
-        """Extract activities from the Excel sheet"""
-        activities = []
+    def _extract_activities(self, head_rows: List[tuple], remaining_rows) -> Iterator[Union[ActivitySection, Activity]]:
+        """Extract section changes and activities from the Excel sheet, one row at a time"""
         current_section = None
-        header_row = None
         
         # Find the header row - support both new format (S/No) and old format (Activities/Tasks)
         header_row = None
         old_format = False
         
-        for row in range(1, 20):
-            cell = self.worksheet.cell(row=row, column=1)
-            if cell.value == "S/No":
+        for row, row_data in enumerate(head_rows, start=1):
+            if row_data[0] == "S/No":
                 header_row = row
                 old_format = False
                 break
-            elif cell.value == "Activities/Tasks":
+            elif row_data[0] == "Activities/Tasks":
                 header_row = row
                 old_format = True
                 break
@@ -1541,23 +1916,28 @@ class ExcelLoader:
             raise ValueError("Could not find header row with S/No or Activities/Tasks column")
         
         # Process rows after header
-        for row in range(header_row + 1, self.worksheet.max_row + 1):
-            row_data = self._get_row_data(row)
-            
+        body_rows = itertools.chain(
+            enumerate(head_rows[header_row:], start=header_row + 1),
+            enumerate(remaining_rows, start=len(head_rows) + 1)
+        )
+        for row, row_data in body_rows:
+            self.current_row = row
             if not any(row_data):  # Skip empty rows
                 continue
             
             # Check if this is a section header
-            if self._is_section_row(row):
-                section_name = self.worksheet.cell(row=row, column=1).value
+            if self._is_section_row(row, row_data):
+                section_name = row_data[0]
                 if "Pre-Kickoff" in section_name or "Pre Kickoff" in section_name:
                     current_section = ActivitySection.PRE_KICKOFF
+                    yield current_section
                 elif "Post Kick-off" in section_name or "Post Kickoff" in section_name:
                     current_section = ActivitySection.POST_KICKOFF
+                    yield current_section
                 continue
             
             # Check if this is the total row
-            if self._is_total_row(row):
+            if self._is_total_row(row_data):
                 break
             
             # Extract activity data
@@ -1605,39 +1985,92 @@ class ExcelLoader:
                         budget=budget,
                         section=current_section
                     )
-                    activities.append(activity)
+                    yield activity
                     
             except (ValueError, TypeError) as e:
                 # Skip rows with invalid data
                 continue
-        
-        return activities
     
-    def _get_row_data(self, row: int) -> List:
-        """Get all cell values from a row"""
-        return [self.worksheet.cell(row=row, column=col).value for col in range(1, 10)]
-    
-    def _is_section_row(self, row: int) -> bool:
+    def _is_section_row(self, row: int, row_data: tuple) -> bool:
         """Check if row is a section header"""
-        cell = self.worksheet.cell(row=row, column=1)
-        if not cell.value:
+        if not row_data[0]:
             return False
         
-        value = str(cell.value).lower()
+        value = str(row_data[0]).lower()
         return ("kickoff" in value or "kick-off" in value) and self._is_merged_across_columns(row, 1)
     
-    def _is_total_row(self, row: int) -> bool:
+    def _is_total_row(self, row_data: tuple) -> bool:
         """Check if row is the total budget row"""
         # Check if "Total:" appears in Resources column (column 8)
-        total_cell = self.worksheet.cell(row=row, column=8)
-        return total_cell.value and str(total_cell.value).strip().lower() == "total:"
+        total_value = row_data[7]
+        return total_value and str(total_value).strip().lower() == "total:"
     
     def _is_merged_across_columns(self, row: int, col: int) -> bool:
         """Check if cell is merged across multiple columns"""
-        cell = self.worksheet.cell(row=row, column=col)
-        for merged_range in self.worksheet.merged_cells.ranges:
-            if cell.coordinate in merged_range:
-                return True
-        return False
+        return (row, col) in self.merged_anchors
+
+
+class CsvPlanLoader:
+    """Loads an execution-plan CSV with the same interface as ExcelLoader"""
+    
+    def __init__(self, source, strict: bool = False):
+        # source is a file path or an iterable of text lines
+        self.source = source
+        self.strict = strict
+        self.reader = None
+        self.project_title = None
+        self.calendar_format = None
+        self.start_date = None
+        self.current_row = 0
+        self.total_rows = None
+        self.warnings = []
+    
+    def load_project(self) -> Optional[Project]:
+        """Load project data from the CSV file"""
+        activities = [item for item in self.iter_activities() if isinstance(item, Activity)]
+        return Project(
+            title=self.project_title,
+            calendar_format=self.calendar_format,
+            activities=activities
+        )
+    
+    def iter_activities(self) -> Iterator[Union[ActivitySection, Activity]]:
+        """Stream the plan like ExcelLoader.iter_activities. CSV plans carry no calendar
+        format or start date, so calendar_format is the 6-day default ExcelLoader also uses."""
+        is_path = isinstance(self.source, str)
+        lines = open(self.source, 'r', encoding='utf-8-sig', newline='') if is_path else self.source
+        try:
+            self.reader = PlanCsvReader(lines, strict=self.strict)
+            self.warnings = self.reader.warnings
+            self.calendar_format = CalendarFormat.SIX_DAY
+            
+            current_section = None
+            for row in self.reader:
+                self.current_row = row.line
+                self.project_title = self._title()
+                section = ActivitySection(row.section)
+                if section != current_section:
+                    current_section = section
+                    yield current_section
+                yield Activity(
+                    task=row.task,
+                    action_needed=row.action_needed,
+                    duration=row.duration,
+                    precursor=row.precursor,
+                    sequence=row.sequence,
+                    resources=row.resources,
+                    budget=row.budget,
+                    section=section
+                )
+            self.project_title = self._title()
+        finally:
+            if is_path:
+                lines.close()
+    
+    def _title(self) -> Optional[str]:
+        """Title row of the plan, or the file name when it has none"""
+        if self.reader.title or not isinstance(self.source, str):
+            return self.reader.title
+        return os.path.splitext(os.path.basename(self.source))[0]
 
 
@@ -1,7 +1,9 @@
 import sqlite3
 import os
 import tempfile
+import threading
 import uuid
+from contextlib import contextmanager, nullcontext
 
 # Check if Turso is configured
 TURSO_URL = os.environ.get("TURSO_DATABASE_URL")
@@ -11,6 +13,20 @@ TURSO_TOKEN = os.environ.get("TURSO_AUTH_TOKEN")
 if TURSO_URL and TURSO_URL.startswith("libsql://"):
     TURSO_URL = TURSO_URL.replace("libsql://", "https://", 1)
 
+# Embedded read replica for Turso: the API serves reads from this local SQLite file and
+# sends writes to Turso, refreshing the file after each write and, to pick up other
+# instances' writes, at most TURSO_REPLICA_SYNC_SECONDS after the last refresh. To try
+# it locally, point TURSO_DATABASE_URL at a second SQLite file (file:///path/primary.db)
+# with any TURSO_AUTH_TOKEN
+TURSO_REPLICA_PATH = os.environ.get("TURSO_REPLICA_PATH")
+TURSO_REPLICA_SYNC_SECONDS = float(os.environ.get("TURSO_REPLICA_SYNC_SECONDS", "60"))
+
+# Local SQLite connection pool (repository.AsyncDatabase)
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", "8"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# How long a request waits for a free pooled connection
+SQLITE_POOL_TIMEOUT = float(os.environ.get("SQLITE_POOL_TIMEOUT", "30"))
+
 class DummyCursor:
     def __init__(self, result):
         self.result = result
@@ -29,11 +45,36 @@ class DummyCursor:
             return dict(zip(columns, self.result.rows[0]))
         return None
 
+class PendingCursor:
+    """The result of a statement queued in a pipeline; reading it sends the queue"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = None
+
+    def _result(self):
+        if self.cursor is None:
+            self.conn.flush()
+        if self.cursor is None:
+            raise RuntimeError("Statement was never sent: its pipeline was discarded before it was flushed")
+        return self.cursor
+
+    def fetchall(self):
+        return self._result().fetchall()
+
+    def fetchone(self):
+        return self._result().fetchone()
+
 class DBConnectionWrapper:
     def __init__(self, url, token):
         import libsql_client
         # Connect to Turso over HTTP
         self.client = libsql_client.create_client_sync(url=url, auth_token=token)
+        # One client serves every thread, so each thread queues its own pipeline
+        self._local = threading.local()
+
+    def _queue(self):
+        return getattr(self._local, 'queue', None)
 
     def execute(self, sql, args=None):
         if args is None:
@@ -41,14 +82,56 @@ class DBConnectionWrapper:
         # Ensure args is a list as required by some libsql-client bindings
         if isinstance(args, tuple):
             args = list(args)
+        
+        queue = self._queue()
+        if queue is not None:
+            pending = PendingCursor(self)
+            queue.append((sql, args, pending))
+            return pending
             
         # Execute query against Turso
         result = self.client.execute(sql, args)
         return DummyCursor(result)
 
+    def executemany(self, sql, seq_of_args):
+        # One batch: a single round trip, run by Turso as one transaction
+        self.batch([(sql, args) for args in seq_of_args])
+
+    def batch(self, statements):
+        """Run [(sql, args), ...] as one request and one transaction; returns a cursor per statement"""
+        if self._queue() is not None:
+            return [self.execute(sql, args) for sql, args in statements]
+        results = self.client.batch([(sql, list(args)) for sql, args in statements])
+        return [DummyCursor(result) for result in results]
+
+    @contextmanager
+    def pipeline(self):
+        """Queue this thread's statements instead of sending each one, and send them as
+        a single batch when a queued result is read, on commit() or when the block ends.
+        Each flush is one round trip and one transaction; an exception in the block
+        discards whatever is still queued."""
+        if self._queue() is not None:
+            yield self
+            return
+        self._local.queue = []
+        try:
+            yield self
+            self.flush()
+        finally:
+            self._local.queue = None
+
+    def flush(self):
+        queue = self._queue()
+        if not queue:
+            return
+        self._local.queue = []
+        results = self.client.batch([(sql, args) for sql, args, _ in queue])
+        for (_, _, pending), result in zip(queue, results):
+            pending.cursor = DummyCursor(result)
+
     def commit(self):
-        # Turso client automatically handles transactions/commits on simple execute calls
-        pass
+        # Outside a pipeline every execute is its own implicit transaction
+        self.flush()
 
     def close(self):
         self.client.close()
@@ -69,48 +152,213 @@ def get_db_connection():
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
-def init_db():
-    conn = get_db_connection()
+def execute_batch(conn, statements):
+    """Run [(sql, [args, ...]), ...] atomically: a single batch on Turso, or executemany
+    inside one transaction on SQLite"""
+    if isinstance(conn, DBConnectionWrapper):
+        conn.batch([(sql, args) for sql, rows in statements for args in rows])
+        return
+    with conn:
+        for sql, rows in statements:
+            conn.executemany(sql, rows)
+
+# Schema migrations. Each one returns the statements that bring the schema from the
+# previous version to its own, given the connection so it can inspect what already
+# exists (databases created before schema_version was tracked already have some of it).
+# Statements run as one atomic batch together with the schema_version row, so a
+# migration is either fully applied and recorded or not at all. Append new migrations;
+# never edit or reorder applied ones.
+
+def _columns(conn, table):
+    return [row['name'] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+def _create_tables(conn):
+    return [
+        '''
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            start_date TEXT,
+            calendar_format TEXT CHECK(calendar_format IN ('5-day week', '6-day week', '7-day week')) DEFAULT '5-day week',
+            logo_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS activities (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            task TEXT NOT NULL,
+            action_needed TEXT,
+            duration INTEGER NOT NULL DEFAULT 0,
+            precursor TEXT,
+            sequence INTEGER NOT NULL,
+            resources TEXT,
+            budget REAL NOT NULL DEFAULT 0.0,
+            section TEXT CHECK(section IN ('Pre-Kickoff Activities', 'Post Kick-off Activities')),
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+        )
+        ''',
+    ]
+
+def _index_activities(conn):
+    # Serves activity lists, exports and the per-project aggregates in section and
+    # sequence order, and the ON DELETE CASCADE lookup by project_id
+    return ["CREATE INDEX IF NOT EXISTS idx_activities_project ON activities(project_id, section, sequence)"]
+
+def _track_total_budget(conn):
+    # Keep projects.total_budget equal to the sum of its activities' budgets, so the
+    # dashboard can sort by it through an index
+    statements = []
+    if 'total_budget' not in _columns(conn, 'projects'):
+        statements += [
+            "ALTER TABLE projects ADD COLUMN total_budget REAL NOT NULL DEFAULT 0.0",
+            "UPDATE projects SET total_budget = (SELECT COALESCE(SUM(budget), 0.0) FROM activities WHERE project_id = projects.id)",
+        ]
+    statements += [
+        '''
+        CREATE TRIGGER IF NOT EXISTS activities_budget_insert AFTER INSERT ON activities BEGIN
+            UPDATE projects SET total_budget = total_budget + NEW.budget WHERE id = NEW.project_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS activities_budget_delete AFTER DELETE ON activities BEGIN
+            UPDATE projects SET total_budget = total_budget - OLD.budget WHERE id = OLD.project_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS activities_budget_update AFTER UPDATE OF budget, project_id ON activities BEGIN
+            UPDATE projects SET total_budget = total_budget - OLD.budget WHERE id = OLD.project_id;
+            UPDATE projects SET total_budget = total_budget + NEW.budget WHERE id = NEW.project_id;
+        END
+        ''',
+    ]
+    return statements
+
+def _index_project_sort_keys(conn):
+    # One index per dashboard sort order; id breaks ties for keyset pagination
+    return [
+        "CREATE INDEX IF NOT EXISTS idx_projects_title ON projects(title COLLATE NOCASE, id)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects(IFNULL(start_date, ''), id)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects(updated_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_total_budget ON projects(total_budget, id)",
+    ]
+
+def _add_project_version(conn):
+    # Incremented by every change to a project or its activities
+    if 'version' in _columns(conn, 'projects'):
+        return []
+    return ["ALTER TABLE projects ADD COLUMN version INTEGER NOT NULL DEFAULT 1"]
+
+MIGRATIONS = [
+    (1, "Create projects and activities", _create_tables),
+    (2, "Index activities by project, section and sequence", _index_activities),
+    (3, "Track each project's total budget", _track_total_budget),
+    (4, "Index project dashboard sort keys", _index_project_sort_keys),
+    (5, "Add a version to projects", _add_project_version),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Highest applied migration, 0 for a new database"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    if not isinstance(conn, DBConnectionWrapper):
+        conn.commit()
+    row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    return row['version'] or 0
+
+def _apply_migration(conn, statements):
+    # statements is a list of (sql, args) pairs
+    if isinstance(conn, DBConnectionWrapper):
+        conn.batch(statements)
+        return
+    # sqlite3 only opens transactions implicitly for DML, so DDL needs an explicit BEGIN
+    conn.execute("BEGIN")
+    try:
+        for sql, args in statements:
+            conn.execute(sql, args)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def migrate(conn):
+    """Apply pending migrations in order; returns the versions applied"""
+    # On Turso, queue the DDL and send it along with the next read (or at the end), so a
+    # new database takes a few round trips rather than two or three per migration
+    with (conn.pipeline() if isinstance(conn, DBConnectionWrapper) else nullcontext()):
+        current = get_schema_version(conn)
+        applied = []
+        for version, description, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            statements = [(sql, ()) for sql in migration(conn)]
+            statements.append(("INSERT INTO schema_version (version, description) VALUES (?, ?)", (version, description)))
+            _apply_migration(conn, statements)
+            applied.append(version)
+    return applied
+
+def init_db(conn=None):
+    """Bring the schema up to date, on conn or on a fresh connection to the configured database"""
+    own_connection = conn is None
+    if own_connection:
+        conn = get_db_connection()
     
     # Only set journal mode if using local SQLite
-    if not (TURSO_URL and TURSO_TOKEN):
+    if not isinstance(conn, DBConnectionWrapper):
         try:
             conn.execute("PRAGMA journal_mode = WAL")
         except sqlite3.OperationalError:
             pass
-            
-    # Create projects table
-    conn.execute('''
-    CREATE TABLE IF NOT EXISTS projects (
-        id TEXT PRIMARY KEY,
-        title TEXT NOT NULL,
-        start_date TEXT,
-        calendar_format TEXT CHECK(calendar_format IN ('5-day week', '6-day week', '7-day week')) DEFAULT '5-day week',
-        logo_path TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
     
-    # Create activities table
-    conn.execute('''
-    CREATE TABLE IF NOT EXISTS activities (
-        id TEXT PRIMARY KEY,
-        project_id TEXT NOT NULL,
-        task TEXT NOT NULL,
-        action_needed TEXT,
-        duration INTEGER NOT NULL DEFAULT 0,
-        precursor TEXT,
-        sequence INTEGER NOT NULL,
-        resources TEXT,
-        budget REAL NOT NULL DEFAULT 0.0,
-        section TEXT CHECK(section IN ('Pre-Kickoff Activities', 'Post Kick-off Activities')),
-        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
-    )
-    ''')
+    migrate(conn)
     
-    conn.commit()
-    conn.close()
+    if own_connection:
+        conn.close()
 
-# Initialize the database tables on module import
-init_db()
+def init_replica(path):
+    """Create or migrate the schema of a local read replica"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        init_db(conn)
+    finally:
+        conn.close()
+
+def _applied_schema_version(conn):
+    """Highest applied migration in one read, or None if it cannot be read (a new database)"""
+    try:
+        row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    except Exception:
+        return None
+    return row['version'] if row else None
+
+# The schema is checked on first use rather than at import, so a cold start that never
+# touches the database (and the import itself) pays nothing. The check is one read; the
+# DDL in init_db only runs when a deployment ships a new migration, on its first start.
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def ensure_schema():
+    """Bring the configured database up to SCHEMA_VERSION, once per process"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn = get_db_connection()
+        try:
+            if _applied_schema_version(conn) != SCHEMA_VERSION:
+                init_db(conn)
+        finally:
+            conn.close()
+        _schema_ready = True
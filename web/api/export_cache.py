@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+from versions import GENERATOR_VERSION
+
+# Generated workbooks are cached on local disk, keyed by a hash of everything that
+# ends up in the file. Size is bounded and the least recently used files are evicted first.
+EXPORT_CACHE_DIR = os.environ.get("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "psp_export_cache"))
+EXPORT_CACHE_MAX_BYTES = int(os.environ.get("EXPORT_CACHE_MAX_MB", "200")) * 1024 * 1024
+# How long a request waits on an identical export already in progress before giving up
+EXPORT_COALESCE_TIMEOUT = float(os.environ.get("EXPORT_COALESCE_TIMEOUT", "60"))
+
+
+def _logo_fingerprint(logo_path):
+    """Identify the logo file that will be embedded, without reading the whole image"""
+    from core_logic import resolve_logo_path
+    path = resolve_logo_path(logo_path)
+    if not path:
+        return None
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def make_export_key(project_row, activity_rows, today=None, options=None):
+    """Hash the project content, calendar format, logo, export options and generator version into a cache key"""
+    project = dict(project_row)
+    payload = {
+        'generator_version': GENERATOR_VERSION,
+        'options': options or {},
+        'calendar_format': project.get('calendar_format'),
+        'logo': _logo_fingerprint(project.get('logo_path')),
+        'project': {k: v for k, v in project.items() if k != 'id'},
+        'activities': [{k: v for k, v in dict(a).items() if k not in ('id', 'project_id')} for a in activity_rows],
+    }
+    # The Gantt sheet falls back to today's date when the project has no start date
+    if not project.get('start_date'):
+        payload['today'] = today
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ExportCache:
+    """Size-bounded LRU cache of generated workbooks on local disk"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.xlsx")
+
+    def get(self, key: str):
+        """Return the cached file path for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, source) -> str:
+        """Copy a freshly generated file object into the cache and evict old entries"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Write beside the final name and rename, so readers never see a partial file
+        temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            source.seek(0)
+            with open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".xlsx"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        # Oldest first
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one.
+
+    The first caller starts the work as a task; callers arriving while it runs wait for
+    the same task, so all of them get its result or its exception. Waiting callers give
+    up after timeout seconds with asyncio.TimeoutError, and a caller that goes away
+    (timeout or disconnect) never cancels the work for the others.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._flights = {}
+
+    async def run(self, key: str, work):
+        """Return the result of await work(), shared with concurrent callers for key"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            return await asyncio.wait_for(asyncio.shield(flight), self.timeout)
+
+        flight = asyncio.ensure_future(work())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(flight)
+
+    def _landed(self, key: str, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception retrieved even if every caller has gone away
+        if not flight.cancelled():
+            flight.exception()
+
+
+export_cache = ExportCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
+export_flights = SingleFlight(EXPORT_COALESCE_TIMEOUT)
@@ -0,0 +1,337 @@
+"""
+Background Excel exports.
+
+Each job is a row in a small SQLite database next to the finished files. The row
+holds a snapshot of the project and its activities taken when the job was
+enqueued, so a job can be (re)run by any process, including after a restart.
+Jobs run in a process pool. The worker claims a job, reports progress on its row
+and writes the workbook to EXPORT_JOBS_DIR, where the download route serves it.
+"""
+
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from export_cache import export_cache, make_export_key
+
+if TYPE_CHECKING:
+    from core_logic import Project, ExcelGenerator
+
+EXPORT_JOBS_DIR = os.environ.get("EXPORT_JOBS_DIR", os.path.join(tempfile.gettempdir(), "psp_export_jobs"))
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+# Finished jobs and their files are removed after this long
+EXPORT_JOB_TTL_HOURS = float(os.environ.get("EXPORT_JOB_TTL_HOURS", "24"))
+# A running job not updated for this long is assumed to have lost its worker and is requeued
+EXPORT_JOB_STALE_SECONDS = int(os.environ.get("EXPORT_JOB_STALE_SECONDS", "300"))
+EXPORT_JOB_MAX_ATTEMPTS = 3
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def build_project(p, activities_db, default_start_date: Optional[datetime.date] = None) -> 'Project':
+    """Rebuild a core_logic Project from a projects row and its activity rows, in order.
+    Projects without a start date get default_start_date."""
+    from core_logic import Project, Activity, ActivitySection, CalendarFormat
+
+    start_date = default_start_date
+    if p['start_date']:
+        start_date = datetime.date.fromisoformat(p['start_date'])
+
+    # Map calendar format
+    cal_format = CalendarFormat.FIVE_DAY
+    if p['calendar_format'] == '6-day week':
+        cal_format = CalendarFormat.SIX_DAY
+    elif p['calendar_format'] == '7-day week':
+        cal_format = CalendarFormat.SEVEN_DAY
+
+    core_project = Project(
+        title=p['title'],
+        calendar_format=cal_format,
+        start_date=start_date
+    )
+
+    for a in activities_db:
+        section = ActivitySection.PRE_KICKOFF if a['section'] == ActivitySection.PRE_KICKOFF.value else ActivitySection.POST_KICKOFF
+        activity = Activity(
+            task=a['task'],
+            action_needed=a['action_needed'] or "",
+            duration=a['duration'],
+            precursor=a['precursor'] or "",
+            sequence=a['sequence'],
+            resources=a['resources'] or "",
+            budget=a['budget'],
+            section=section
+        )
+        core_project.add_activity(activity)
+    return core_project
+
+
+def build_generator(p, activities_db, deterministic: bool, profile: str) -> 'ExcelGenerator':
+    from core_logic import ExcelGenerator, ExportProfile
+
+    core_project = build_project(p, activities_db)
+    export_profile = ExportProfile(profile)
+    if deterministic:
+        # Stamp the last modification time so identical data always yields identical bytes
+        generated_at = datetime.datetime.fromisoformat(p['updated_at']) if p['updated_at'] else None
+        return ExcelGenerator(core_project, custom_logo_path=p['logo_path'], deterministic=True,
+                              generated_at=generated_at, profile=export_profile)
+    return ExcelGenerator(core_project, custom_logo_path=p['logo_path'], profile=export_profile)
+
+
+def export_filename(p) -> str:
+    return f"{p['title'].replace(' ', '_')}_Schedule.xlsx"
+
+
+class ExportJobStore:
+    """Export jobs in a local SQLite file; every call uses its own short-lived connection,
+    so the store can be shared by the API's threads and the worker processes"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, "jobs.db")
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS export_jobs (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('queued', 'running', 'done', 'failed')) DEFAULT 'queued',
+                progress INTEGER NOT NULL DEFAULT 0,
+                options TEXT NOT NULL,
+                export_key TEXT,
+                payload TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                file_path TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            # Job databases from before identical exports were coalesced
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(export_jobs)").fetchall()]
+            if 'export_key' not in columns:
+                conn.execute("ALTER TABLE export_jobs ADD COLUMN export_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_export_jobs_status ON export_jobs(status, updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_export_jobs_key ON export_jobs(export_key, status)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def create(self, project_row, activity_rows, options: dict, export_key: str):
+        """Queue a job with a snapshot of the project as it is now. If an identical export
+        (same export_key) is already queued or running, return that job instead; the
+        second element is True when a new job was created."""
+        project = dict(project_row)
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two processes cannot both miss
+            # the active job and queue duplicates
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                active = conn.execute(
+                    "SELECT id FROM export_jobs WHERE export_key = ? AND status IN ('queued', 'running') "
+                    "ORDER BY created_at LIMIT 1", (export_key,)
+                ).fetchone()
+                if active:
+                    job_id = active['id']
+                else:
+                    job_id = str(uuid.uuid4())
+                    payload = json.dumps({'project': project, 'activities': [dict(a) for a in activity_rows]})
+                    conn.execute(
+                        "INSERT INTO export_jobs (id, project_id, options, export_key, payload, filename) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (job_id, project['id'], json.dumps(options), export_key, payload, export_filename(project))
+                    )
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            conn.close()
+        return self.get(job_id), not active
+
+    def get(self, job_id: str):
+        """The job without its payload, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, project_id, status, progress, options, filename, file_path, error, attempts, created_at, updated_at "
+                "FROM export_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def claim(self, job_id: str):
+        """Mark a queued job running and return its payload, or None if another worker has it"""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE export_jobs SET status = 'running', progress = 0, attempts = attempts + 1, "
+                    "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'", (job_id,)
+                )
+                if cursor.rowcount == 0:
+                    return None
+                row = conn.execute("SELECT options, payload FROM export_jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['options']), json.loads(row['payload'])
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"UPDATE export_jobs SET {columns}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                             (*fields.values(), job_id))
+        finally:
+            conn.close()
+
+    def requeue_stale(self, stale_seconds: int = EXPORT_JOB_STALE_SECONDS):
+        """Give running jobs whose worker stopped reporting back to the queue, or fail
+        them once they have used up their attempts; returns the ids of queued jobs"""
+        conn = self._connect()
+        try:
+            with conn:
+                stale = f"status = 'running' AND updated_at < datetime('now', '-{int(stale_seconds)} seconds')"
+                conn.execute(f"UPDATE export_jobs SET status = 'failed', error = 'Export worker stopped responding' "
+                             f"WHERE {stale} AND attempts >= {EXPORT_JOB_MAX_ATTEMPTS}")
+                conn.execute(f"UPDATE export_jobs SET status = 'queued', progress = 0 WHERE {stale}")
+            rows = conn.execute("SELECT id FROM export_jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        finally:
+            conn.close()
+        return [row['id'] for row in rows]
+
+    def purge(self, ttl_hours: float = EXPORT_JOB_TTL_HOURS):
+        """Delete finished jobs older than ttl_hours, and their files"""
+        conn = self._connect()
+        try:
+            with conn:
+                expired = conn.execute(
+                    "SELECT id, file_path FROM export_jobs WHERE status IN ('done', 'failed') "
+                    "AND updated_at < datetime('now', ?)", (f"-{ttl_hours} hours",)
+                ).fetchall()
+                conn.executemany("DELETE FROM export_jobs WHERE id = ?", [(row['id'],) for row in expired])
+        finally:
+            conn.close()
+        for row in expired:
+            if row['file_path'] and os.path.exists(row['file_path']):
+                os.remove(row['file_path'])
+
+
+def run_export_job(directory: str, job_id: str):
+    """Process pool entry point: claim the job, build the workbook and record the result"""
+    store = ExportJobStore(directory)
+    claimed = store.claim(job_id)
+    if claimed is None:
+        return
+    options, payload = claimed
+    p, activities_db = payload['project'], payload['activities']
+    file_path = os.path.join(directory, f"{job_id}.xlsx")
+    temp_path = os.path.join(directory, f".{job_id}.tmp")
+    try:
+        cache_key = make_export_key(p, activities_db, today=datetime.date.today().isoformat(), options=options)
+        cached_path = export_cache.get(cache_key)
+        if cached_path:
+            shutil.copyfile(cached_path, temp_path)
+        else:
+            generator = build_generator(p, activities_db, options['deterministic'], options['profile'])
+            store.update(job_id, progress=10)
+            generator.generate(temp_path)
+            store.update(job_id, progress=90)
+            with open(temp_path, "rb") as source:
+                export_cache.put(cache_key, source)
+        # The download route only ever sees a complete file
+        os.replace(temp_path, file_path)
+    except Exception as e:
+        store.update(job_id, status=FAILED, error=str(e) or type(e).__name__)
+        raise
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    store.update(job_id, status=DONE, progress=100, file_path=file_path)
+
+
+class ExportJobQueue:
+    """Submits stored jobs to a lazily started process pool"""
+
+    def __init__(self, directory: str, workers: int):
+        self.store = ExportJobStore(directory)
+        self.directory = directory
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the API process has running threads and event loops
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _submit(self, job_id: str):
+        future = self._get_executor().submit(run_export_job, self.directory, job_id)
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+
+    def _finished(self, job_id: str, future):
+        error = future.exception()
+        if error is None:
+            return
+        # A worker that died takes the pool down with it; start a fresh pool for later jobs
+        if type(error).__name__ == "BrokenProcessPool":
+            with self._lock:
+                self._executor = None
+            self.store.update(job_id, status=FAILED, error="Export worker exited unexpectedly")
+
+    def get(self, job_id: str):
+        """The job, after requeueing it if its worker has stopped reporting"""
+        job = self.store.get(job_id)
+        if job and job['status'] == RUNNING:
+            updated_at = datetime.datetime.fromisoformat(job['updated_at'])
+            if (datetime.datetime.utcnow() - updated_at).total_seconds() > EXPORT_JOB_STALE_SECONDS:
+                self.recover()
+                job = self.store.get(job_id)
+        return job
+
+    def enqueue(self, project_row, activity_rows, options: dict) -> dict:
+        """Queue an export, or join the identical one already queued or running"""
+        export_key = make_export_key(project_row, activity_rows, today=datetime.date.today().isoformat(),
+                                     options=options)
+        job, created = self.store.create(project_row, activity_rows, options, export_key)
+        if created:
+            self._submit(job['id'])
+        return job
+
+    def recover(self):
+        """Resubmit jobs left queued or running by a previous process, and drop expired ones"""
+        self.store.purge()
+        for job_id in self.store.requeue_stale():
+            self._submit(job_id)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+export_jobs = ExportJobQueue(EXPORT_JOBS_DIR, EXPORT_WORKERS)
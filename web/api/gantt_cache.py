@@ -0,0 +1,84 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+# Computed Gantt payloads, kept per project as already-encoded JSON together with the tag
+# (project version, generator version and date) they were computed for. The in-process tier
+# is a small LRU; setting GANTT_CACHE_DIR adds an on-disk tier shared by every worker on
+# the host. Writes invalidate the entry in this process and on disk; an entry another
+# worker still holds in memory is never served, because its tag names an older version.
+GANTT_CACHE_SIZE = int(os.environ.get("GANTT_CACHE_SIZE", "256"))
+GANTT_CACHE_DIR = os.environ.get("GANTT_CACHE_DIR")
+
+
+class GanttCache:
+    """Two-tier cache of Gantt payloads, one entry per project"""
+
+    def __init__(self, size: int, directory=None):
+        self.size = size
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, project_id: str) -> str:
+        return os.path.join(self.directory, f"{project_id}.json")
+
+    def get(self, project_id: str, tag: str):
+        """The payload bytes computed under this tag, or None"""
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None:
+                if entry[0] == tag:
+                    self._entries.move_to_end(project_id)
+                    return entry[1]
+                # Computed for an older version or another day; it will not be asked for again
+                del self._entries[project_id]
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(project_id), "rb") as source:
+                if source.readline().decode("utf-8").rstrip("\n") != tag:
+                    return None
+                payload = source.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        self._remember(project_id, tag, payload)
+        return payload
+
+    def put(self, project_id: str, tag: str, payload: bytes):
+        self._remember(project_id, tag, payload)
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Written and renamed into place like ExportCache.put
+        temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, "wb") as target:
+                target.write(tag.encode("utf-8") + b"\n")
+                target.write(payload)
+            os.replace(temp_path, self._path(project_id))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _remember(self, project_id: str, tag: str, payload: bytes):
+        with self._lock:
+            self._entries[project_id] = (tag, payload)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, project_id: str):
+        """Drop the project's entry from both tiers"""
+        with self._lock:
+            self._entries.pop(project_id, None)
+        if self.directory:
+            try:
+                os.remove(self._path(project_id))
+            except FileNotFoundError:
+                pass
+
+
+gantt_cache = GanttCache(GANTT_CACHE_SIZE, GANTT_CACHE_DIR)
@@ -1,10 +1,21 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Depends, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uuid
+import asyncio
+import base64
+import functools
+import io
+import itertools
+import json
 import os
 import tempfile
-from typing import List
+import datetime
+from datetime import date
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+from typing import List, Optional, Union
 
 import os
 import sys
@@ -12,75 +23,220 @@ import sys
 # Ensure Vercel can find modules in the api directory
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models import ProjectCreate, ProjectUpdate, ProjectResponse, ActivityCreate, ActivityUpdate, ActivityResponse
-from database import get_db_connection
-from core_logic import Project, Activity, ActivitySection, CalendarFormat, ExcelGenerator, GanttChartGenerator
-import openpyxl
-
-app = FastAPI(title="Project Scheduler API", docs_url="/api/docs", openapi_url="/api/openapi.json")
-
-@app.get("/api/projects", response_model=List[ProjectResponse])
-def list_projects():
-    conn = get_db_connection()
-    projects = conn.execute("SELECT * FROM projects").fetchall()
-    result = []
-    for p in projects:
-        # Get activities for this project
-        activities = conn.execute("SELECT * FROM activities WHERE project_id = ?", (p['id'],)).fetchall()
-        p_dict = dict(p)
-        p_dict['activities'] = [dict(a) for a in activities]
-        result.append(p_dict)
-    conn.close()
-    return result
+from models import ProjectCreate, ProjectUpdate, ProjectResponse, ActivityCreate, ActivityUpdate, ActivityResponse, ExportProfileStr, CalendarFormatStr, ProjectSummary, ProjectPage, DashboardSortStr, SortOrderStr, ExportJobResponse, ActivityBatch, ActivityBatchResult, ActivityOperationStr
+from repository import ProjectRepository, ActivityBatchRejected, async_db, get_repository
+from export_cache import export_cache, export_flights, make_export_key
+from export_jobs import export_jobs, build_generator, build_project, export_filename
+from gantt_cache import gantt_cache
+from responses import dumps, gzip_etag, json_response, project_content
+from versions import GANTT_VERSION
+# core_logic pulls in openpyxl (and numpy through it), so it is imported inside the
+# upload, export and Gantt code paths instead of here; every other route, and the
+# cold start, skips it
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up exports that were queued or running when the last worker stopped
+    await run_in_threadpool(export_jobs.recover)
+    yield
+    export_jobs.shutdown()
+    # Close pooled connections and the Turso client when the worker shuts down
+    await async_db.close()
+
+app = FastAPI(title="Project Scheduler API", docs_url="/api/docs", openapi_url="/api/openapi.json", lifespan=lifespan)
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Exports are built in memory and only spill to a temp file past this size
+EXPORT_SPOOL_MAX_BYTES = int(os.environ.get("EXPORT_SPOOL_MAX_MB", "16")) * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _encode_cursor(sort_value, project_id: str) -> str:
+    payload = json.dumps([sort_value, project_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def _decode_cursor(cursor: str):
+    try:
+        sort_value, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, project_id
+
+# Strong ETags from the project version, which every change to a project or its
+# activities increments. The Gantt payload also depends on GANTT_VERSION and on the date
+# (projects without a start date are scheduled from today), so its tag changes daily.
+
+def _project_etag(version: int) -> str:
+    return f'"v{version}"'
+
+def _gantt_etag(version: int) -> str:
+    return f'"v{version}-g{GANTT_VERSION}-{datetime.date.today().isoformat()}"'
+
+def _etag_headers(etag: str) -> dict:
+    # no-cache: browsers keep the response but revalidate it with If-None-Match every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def _matched_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The form of etag, plain or gzipped, that If-None-Match names, or None"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    for candidate in (etag, gzip_etag(etag)):
+        if candidate in tags:
+            return candidate
+    return None
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_etag_headers(etag))
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def _stream_file(buffer, filename: str, media_type: str) -> StreamingResponse:
+    """Stream a file object in chunks and close it once sent (or when the client goes away)"""
+    size = buffer.seek(0, os.SEEK_END)
+    buffer.seek(0)
+
+    def iter_chunks():
+        try:
+            while True:
+                chunk = buffer.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            buffer.close()
+
+    headers = {
+        "Content-Length": str(size),
+        "Content-Disposition": _content_disposition(filename),
+    }
+    return StreamingResponse(iter_chunks(), media_type=media_type, headers=headers)
+
+@app.get("/api/projects", response_model=Union[List[ProjectSummary], List[ProjectResponse]])
+async def list_projects(summary: bool = False, accept_encoding: Optional[str] = Header(None),
+                        repo: ProjectRepository = Depends(get_repository)):
+    if summary:
+        projects = await repo.list_project_summaries()
+        return [dict(p) for p in projects]
+    
+    projects = await repo.list_projects()
+    return await json_response([project_content(p, p['activities']) for p in projects], accept_encoding)
+
+@app.get("/api/dashboard/projects", response_model=ProjectPage)
+async def list_dashboard_projects(sort: DashboardSortStr = DashboardSortStr.UPDATED_AT, order: SortOrderStr = SortOrderStr.DESC,
+                                  limit: int = Query(24, ge=1, le=100), cursor: Optional[str] = None, q: Optional[str] = None,
+                                  repo: ProjectRepository = Depends(get_repository)):
+    """One page of project summaries. Pass next_cursor back as cursor for the following page."""
+    after = _decode_cursor(cursor) if cursor else None
+    rows = [dict(p) for p in await repo.dashboard_page(sort, order, limit, after, q)]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]['sort_value'], rows[-1]['id'])
+    return {'items': rows, 'next_cursor': next_cursor}
 
 @app.post("/api/projects", response_model=ProjectResponse)
-def create_project(project: ProjectCreate):
-    conn = get_db_connection()
+async def create_project(project: ProjectCreate, repo: ProjectRepository = Depends(get_repository)):
     project_id = str(uuid.uuid4())
     start_date_str = project.start_date.isoformat() if project.start_date else None
     
-    conn.execute(
-        "INSERT INTO projects (id, title, start_date, calendar_format, logo_path) VALUES (?, ?, ?, ?, ?)",
-        (project_id, project.title, start_date_str, project.calendar_format.value, project.logo_path)
-    )
-    conn.commit()
-    
-    # Fetch created project
-    p = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-    conn.close()
+    p = await repo.create_project(project_id, project.title, start_date_str, project.calendar_format.value,
+                                  project.logo_path)
     
     p_dict = dict(p)
     p_dict['activities'] = []
     return p_dict
 
+class _UnreadableUpload(Exception):
+    """A parse error raised while an upload's activities are being inserted"""
+
+def _read_upload(file: UploadFile, extension: str):
+    """Start parsing an uploaded workbook or plan. Returns the loader, with the project
+    title and calendar format already read, and an iterator over the rest of its items."""
+    from core_logic import ExcelLoader, CsvPlanLoader
+    
+    if extension == '.xlsx':
+        loader = ExcelLoader(file.file)
+    else:
+        # Reject malformed numbers (with their line and column) rather than importing them as 0
+        loader = CsvPlanLoader(io.TextIOWrapper(file.file, encoding='utf-8-sig', newline=''), strict=True)
+    items = loader.iter_activities()
+    first = next(items, None)
+    return loader, itertools.chain([first] if first is not None else [], items)
+
+def _upload_rows(items, project_id: str):
+    """Activity rows for the insert, parsed as it consumes them"""
+    from core_logic import Activity
+    try:
+        for a in items:
+            if isinstance(a, Activity):
+                yield (str(uuid.uuid4()), project_id, a.task, a.action_needed, a.duration, a.precursor, a.sequence,
+                       a.resources, a.budget, a.section.value)
+    except Exception as e:
+        raise _UnreadableUpload(e) from e
+
+@app.post("/api/projects/import", response_model=ProjectResponse)
+async def import_project(file: UploadFile = File(...), title: Optional[str] = Form(None),
+                         calendar_format: Optional[CalendarFormatStr] = Form(None), start_date: Optional[date] = Form(None),
+                         accept_encoding: Optional[str] = Header(None)):
+    """Create a project from an exported .xlsx workbook or an execution-plan .csv in one request"""
+    name, extension = os.path.splitext(file.filename or "")
+    extension = extension.lower()
+    if extension not in ('.xlsx', '.csv'):
+        raise HTTPException(status_code=400, detail="Upload an .xlsx workbook or an execution-plan .csv file")
+    
+    try:
+        loader, items = await run_in_threadpool(_read_upload, file, extension)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read {file.filename}: {e}")
+    
+    project_id = str(uuid.uuid4())
+    title = title or loader.project_title or name
+    calendar_format = calendar_format.value if calendar_format else loader.calendar_format.value
+    start_date = start_date or loader.start_date
+    start_date_str = start_date.isoformat() if start_date else None
+    
+    # The rest of the file is parsed as its rows are inserted, in one transaction, so a
+    # parse error part way through leaves nothing behind
+    try:
+        async with async_db.repository() as repo:
+            p, activities = await repo.import_project(project_id, title, start_date_str, calendar_format, None,
+                                                      _upload_rows(items, project_id))
+    except _UnreadableUpload as e:
+        raise HTTPException(status_code=400, detail=f"Could not read {file.filename}: {e}")
+    
+    return await json_response(project_content(p, activities), accept_encoding)
+
 @app.get("/api/projects/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: str):
-    conn = get_db_connection()
-    p = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-    if not p:
-        conn.close()
+async def get_project(project_id: str, if_none_match: Optional[str] = Header(None),
+                      accept_encoding: Optional[str] = Header(None), repo: ProjectRepository = Depends(get_repository)):
+    # Answer conditional requests from the version alone, before loading any activities
+    version = await repo.get_project_version(project_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Project not found")
-        
-    activities = conn.execute("SELECT * FROM activities WHERE project_id = ?", (project_id,)).fetchall()
-    conn.close()
+    matched = _matched_etag(if_none_match, _project_etag(version))
+    if matched:
+        return _not_modified(matched)
     
-    p_dict = dict(p)
-    p_dict['activities'] = [dict(a) for a in activities]
-    return p_dict
+    p, activities = await repo.get_project_with_activities(project_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await json_response(project_content(p, activities), accept_encoding,
+                               headers=_etag_headers(_project_etag(p['version'])))
 
 @app.put("/api/projects/{project_id}", response_model=ProjectResponse)
-def update_project(project_id: str, project: ProjectUpdate):
-    conn = get_db_connection()
+async def update_project(project_id: str, project: ProjectUpdate, repo: ProjectRepository = Depends(get_repository)):
     start_date_str = project.start_date.isoformat() if project.start_date else None
     
-    conn.execute(
-        "UPDATE projects SET title = ?, start_date = ?, calendar_format = ?, logo_path = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-        (project.title, start_date_str, project.calendar_format.value, project.logo_path, project_id)
-    )
-    conn.commit()
-    
-    p = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-    conn.close()
+    p = await repo.update_project(project_id, project.title, start_date_str, project.calendar_format.value,
+                                  project.logo_path)
     if not p:
         raise HTTPException(status_code=404, detail="Project not found")
         
@@ -89,148 +245,199 @@ def update_project(project_id: str, project: ProjectUpdate):
     return p_dict
 
 @app.delete("/api/projects/{project_id}")
-def delete_project(project_id: str):
-    conn = get_db_connection()
-    conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-    conn.commit()
-    conn.close()
+async def delete_project(project_id: str, repo: ProjectRepository = Depends(get_repository)):
+    await repo.delete_project(project_id)
     return {"status": "success"}
 
 @app.post("/api/projects/{project_id}/activities", response_model=ActivityResponse)
-def add_activity(project_id: str, activity: ActivityCreate):
-    conn = get_db_connection()
+async def add_activity(project_id: str, activity: ActivityCreate, repo: ProjectRepository = Depends(get_repository)):
     activity_id = str(uuid.uuid4())
     
-    conn.execute(
-        """INSERT INTO activities 
-        (id, project_id, task, action_needed, duration, precursor, sequence, resources, budget, section) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (activity_id, project_id, activity.task, activity.action_needed, activity.duration,
-         activity.precursor, activity.sequence, activity.resources, activity.budget, activity.section.value)
-    )
-    conn.commit()
-    
-    a = conn.execute("SELECT * FROM activities WHERE id = ?", (activity_id,)).fetchone()
-    conn.close()
+    try:
+        a = await repo.add_activity(
+            (activity_id, project_id, activity.task, activity.action_needed, activity.duration,
+             activity.precursor, activity.sequence, activity.resources, activity.budget, activity.section.value)
+        )
+    except ActivityBatchRejected:
+        raise HTTPException(status_code=404, detail="Project not found")
     return dict(a)
 
 @app.delete("/api/projects/{project_id}/activities/{activity_id}")
-def delete_activity(project_id: str, activity_id: str):
-    conn = get_db_connection()
-    conn.execute("DELETE FROM activities WHERE id = ? AND project_id = ?", (activity_id, project_id))
-    conn.commit()
-    conn.close()
+async def delete_activity(project_id: str, activity_id: str, repo: ProjectRepository = Depends(get_repository)):
+    await repo.delete_activity(project_id, activity_id)
     return {"status": "success"}
 
-@app.post("/api/projects/{project_id}/generate-excel")
-def generate_excel(project_id: str, background_tasks: BackgroundTasks):
-    conn = get_db_connection()
-    p = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-    if not p:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Project not found")
+@app.put("/api/projects/{project_id}/activities/{activity_id}", response_model=ActivityResponse)
+async def update_activity(project_id: str, activity_id: str, activity: ActivityUpdate,
+                          repo: ProjectRepository = Depends(get_repository)):
+    try:
+        _, _, updated = await repo.apply_activity_batch(project_id, updated_rows=[(activity_id, *_activity_values(activity))])
+    except ActivityBatchRejected as e:
+        raise HTTPException(status_code=404, detail="Project not found" if e.version is None else "Activity not found")
+    return updated[0]
+
+def _activity_values(activity: ActivityCreate) -> tuple:
+    return (activity.task, activity.action_needed, activity.duration, activity.precursor, activity.sequence,
+            activity.resources, activity.budget, activity.section.value)
+
+@app.post("/api/projects/{project_id}/activities/batch", response_model=ActivityBatchResult)
+async def batch_activities(project_id: str, batch: ActivityBatch, repo: ProjectRepository = Depends(get_repository)):
+    """Create, update, delete and reorder activities in one transaction. Returns the new
+    project version and only the rows that changed; created rows follow the order of
+    their operations. An empty batch changes nothing, not even the version."""
+    created_rows, updated_rows, reordered, deleted_ids = [], [], [], []
+    for position, operation in enumerate(batch.operations):
+        op = operation.op
+        needs_id = op != ActivityOperationStr.CREATE
+        needs_activity = op in (ActivityOperationStr.CREATE, ActivityOperationStr.UPDATE)
+        if needs_id != (operation.id is not None) or (needs_activity and operation.activity is None) \
+                or (op == ActivityOperationStr.REORDER and operation.sequence is None):
+            raise HTTPException(status_code=400, detail=f"Operation {position} is not a valid {op.value}")
         
-    activities_db = conn.execute("SELECT * FROM activities WHERE project_id = ?", (project_id,)).fetchall()
-    conn.close()
+        if op == ActivityOperationStr.CREATE:
+            created_rows.append((str(uuid.uuid4()), project_id, *_activity_values(operation.activity)))
+        elif op == ActivityOperationStr.UPDATE:
+            updated_rows.append((operation.id, *_activity_values(operation.activity)))
+        elif op == ActivityOperationStr.REORDER:
+            reordered.append((operation.id, operation.sequence, operation.section.value if operation.section else None))
+        else:
+            deleted_ids.append(operation.id)
     
-    # Reconstruct core_logic Project
-    import datetime
-    start_date = None
-    if p['start_date']:
-        start_date = datetime.date.fromisoformat(p['start_date'])
-        
-    # Map calendar format
-    cal_format = CalendarFormat.FIVE_DAY
-    if p['calendar_format'] == '6-day week':
-        cal_format = CalendarFormat.SIX_DAY
-    elif p['calendar_format'] == '7-day week':
-        cal_format = CalendarFormat.SEVEN_DAY
-        
-    core_project = Project(
-        title=p['title'],
-        calendar_format=cal_format,
-        start_date=start_date
-    )
+    targeted = [row[0] for row in updated_rows] + [row[0] for row in reordered] + deleted_ids
+    if len(set(targeted)) != len(targeted):
+        raise HTTPException(status_code=400, detail="Each activity can appear in only one operation")
     
-    for a in activities_db:
-        section = ActivitySection.PRE_KICKOFF if a['section'] == 'Pre-Kickoff Activities' else ActivitySection.POST_KICKOFF
-        activity = Activity(
-            task=a['task'],
-            action_needed=a['action_needed'] or "",
-            duration=a['duration'],
-            precursor=a['precursor'] or "",
-            sequence=a['sequence'],
-            resources=a['resources'] or "",
-            budget=a['budget'],
-            section=section
-        )
-        core_project.add_activity(activity)
-        
-    # Generate Excel
-    generator = ExcelGenerator(core_project, custom_logo_path=p['logo_path'])
+    # The version and the targeted ids are checked by the batch's own write, not beforehand,
+    # so concurrent batches made against the same version cannot all succeed
+    try:
+        version, created, updated = await repo.apply_activity_batch(project_id, created_rows, updated_rows, reordered,
+                                                                    deleted_ids, base_version=batch.base_version)
+    except ActivityBatchRejected as e:
+        if e.version is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if batch.base_version is not None and batch.base_version != e.version:
+            raise HTTPException(status_code=409, detail=f"Project is at version {e.version}, not {batch.base_version}")
+        raise HTTPException(status_code=404, detail=f"Activities not found: {', '.join(e.missing)}")
+    return {'version': version, 'created': created, 'updated': updated, 'deleted': deleted_ids}
+
+@app.post("/api/projects/{project_id}/generate-excel")
+async def generate_excel(project_id: str, deterministic: bool = False, profile: ExportProfileStr = ExportProfileStr.FULL):
+    # Return the connection before the (possibly long) workbook generation
+    async with async_db.repository() as repo:
+        p, activities_db = await repo.get_project_with_activities(project_id)
+        if not p:
+            raise HTTPException(status_code=404, detail="Project not found")
     
-    # Save to a temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-    output_path = temp_file.name
-    temp_file.close()
+    filename = export_filename(p)
+    options = {'deterministic': deterministic, 'profile': profile.value}
     
-    generator.generate(output_path)
+    # Serve unchanged projects straight from the export cache
+    cache_key, cached_path = await run_in_threadpool(_cached_export, p, activities_db, options)
+    if cached_path:
+        return FileResponse(path=cached_path, filename=filename, media_type=XLSX_MEDIA_TYPE)
     
-    # Return file and schedule cleanup
-    def cleanup_file(path: str):
-        if os.path.exists(path):
-            os.remove(path)
-            
-    background_tasks.add_task(cleanup_file, output_path)
+    # Concurrent requests for the same content and options share one build. Building the
+    # workbook is CPU-bound, so it runs on the threadpool rather than the event loop.
+    build = functools.partial(run_in_threadpool, _build_export, p, activities_db, options, cache_key)
+    try:
+        path = await export_flights.run(cache_key, build)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="An identical export is still being generated; try again shortly",
+                            headers={"Retry-After": "5"})
+    try:
+        source = open(path, "rb")
+    except FileNotFoundError:
+        # Evicted before this request could open it; build a copy of its own
+        source = open(await build(), "rb")
+    return _stream_file(source, filename, XLSX_MEDIA_TYPE)
+
+def _cached_export(p, activities_db, options: dict):
+    """The export cache key for this content and options, and the cached file if there is one"""
+    cache_key = make_export_key(p, activities_db, today=datetime.date.today().isoformat(), options=options)
+    return cache_key, export_cache.get(cache_key)
+
+def _build_export(p, activities_db, options: dict, cache_key: str) -> str:
+    """Generate the workbook in memory and store it in the export cache; returns its path"""
+    generator = build_generator(p, activities_db, options['deterministic'], options['profile'])
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES) as buffer:
+        generator.generate(buffer)
+        return export_cache.put(cache_key, buffer)
+
+def _job_response(job) -> dict:
+    job = dict(job)
+    job['download_url'] = f"/api/jobs/{job['id']}/download" if job['status'] == 'done' else None
+    return job
+
+@app.post("/api/projects/{project_id}/export-jobs", response_model=ExportJobResponse, status_code=202)
+async def create_export_job(project_id: str, deterministic: bool = False, profile: ExportProfileStr = ExportProfileStr.FULL):
+    """Queue an Excel export; poll GET /api/jobs/{id} and fetch download_url once it is done"""
+    async with async_db.repository() as repo:
+        p, activities_db = await repo.get_project_with_activities(project_id)
+        if not p:
+            raise HTTPException(status_code=404, detail="Project not found")
     
-    filename = f"{core_project.title.replace(' ', '_')}_Schedule.xlsx"
-    return FileResponse(path=output_path, filename=filename, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    job = await run_in_threadpool(export_jobs.enqueue, p, activities_db,
+                                  {'deterministic': deterministic, 'profile': profile.value})
+    return _job_response(job)
+
+@app.get("/api/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str):
+    job = await run_in_threadpool(export_jobs.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@app.get("/api/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    job = await run_in_threadpool(export_jobs.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] != 'done':
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if not job['file_path'] or not os.path.exists(job['file_path']):
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    return FileResponse(path=job['file_path'], filename=job['filename'], media_type=XLSX_MEDIA_TYPE)
 
 @app.get("/api/projects/{project_id}/gantt")
-def get_gantt_data(project_id: str):
-    conn = get_db_connection()
-    p = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-    if not p:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Project not found")
+async def get_gantt_data(project_id: str, if_none_match: Optional[str] = Header(None),
+                         accept_encoding: Optional[str] = Header(None)):
+    # Return the connection before scheduling and compressing, which can take a while
+    async with async_db.repository() as repo:
+        version = await repo.get_project_version(project_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        etag = _gantt_etag(version)
+        matched = _matched_etag(if_none_match, etag)
+        if matched:
+            return _not_modified(matched)
         
-    activities_db = conn.execute("SELECT * FROM activities WHERE project_id = ?", (project_id,)).fetchall()
-    conn.close()
+        # An unchanged project is served from the cache without loading activities or scheduling
+        payload = await run_in_threadpool(gantt_cache.get, project_id, etag)
+        if payload is None:
+            p, activities_db = await repo.get_project_with_activities(project_id)
+            if not p:
+                raise HTTPException(status_code=404, detail="Project not found")
+            etag = _gantt_etag(p['version'])
     
-    # Reconstruct core_logic Project
-    import datetime
-    start_date = None
-    if p['start_date']:
-        start_date = datetime.date.fromisoformat(p['start_date'])
-    else:
-        start_date = datetime.date.today()
-        
-    # Map calendar format
-    cal_format = CalendarFormat.FIVE_DAY
-    if p['calendar_format'] == '6-day week':
-        cal_format = CalendarFormat.SIX_DAY
-    elif p['calendar_format'] == '7-day week':
-        cal_format = CalendarFormat.SEVEN_DAY
-        
-    core_project = Project(
-        title=p['title'],
-        calendar_format=cal_format,
-        start_date=start_date
-    )
+    if payload is None:
+        payload = await run_in_threadpool(_cached_gantt, p, activities_db, etag)
+    return await json_response(accept_encoding=accept_encoding, headers=_etag_headers(etag), body=payload)
+
+def _cached_gantt(p, activities_db, etag: str) -> bytes:
+    payload = dumps(_gantt_response(p, activities_db))
+    gantt_cache.put(p['id'], etag, payload)
+    return payload
+
+def _gantt_response(p, activities_db):
+    import openpyxl
+    from core_logic import GanttChartGenerator
     
-    for a in activities_db:
-        section = ActivitySection.PRE_KICKOFF if 'Pre' in a['section'] else ActivitySection.POST_KICKOFF
-        activity = Activity(
-            task=a['task'],
-            action_needed=a['action_needed'] or "",
-            duration=a['duration'],
-            precursor=a['precursor'] or "",
-            sequence=a['sequence'],
-            resources=a['resources'] or "",
-            budget=a['budget'],
-            section=section
-        )
-        core_project.add_activity(activity)
+    # Projects without a start date are scheduled from today
+    core_project = build_project(p, activities_db, default_start_date=datetime.date.today())
+    start_date = core_project.start_date
+    
+    # Tasks are identified by their activity ids, so the same version always yields the same payload
+    activity_ids = {id(activity): a['id'] for activity, a in zip(core_project.activities, activities_db)}
         
     # Generate timeline data
     # We use a dummy workbook just to instantiate the generator
@@ -249,7 +456,7 @@ def get_gantt_data(project_id: str):
     
     for task in timeline_data['task_timeline']:
         response_data['tasks'].append({
-            'id': str(id(task['activity'])),
+            'id': activity_ids[id(task['activity'])],
             'name': task['activity'].task,
             'start_date': task['start_date'].isoformat(),
             'end_date': task['end_date'].isoformat(),
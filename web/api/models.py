@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
 from enum import Enum
@@ -13,6 +13,34 @@ class ActivitySectionStr(str, Enum):
     PRE_KICKOFF = "Pre-Kickoff Activities"
     POST_KICKOFF = "Post Kick-off Activities"
 
+class ExportProfileStr(str, Enum):
+    FULL = "full"
+    FAST = "fast"
+    DATA_ONLY = "data-only"
+    LIVE = "live"
+
+class DashboardSortStr(str, Enum):
+    TITLE = "title"
+    START_DATE = "start_date"
+    UPDATED_AT = "updated_at"
+    TOTAL_BUDGET = "total_budget"
+
+class SortOrderStr(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+class ActivityOperationStr(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    REORDER = "reorder"
+
+class ExportJobStatusStr(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
 class ActivityCreate(BaseModel):
     task: str
     action_needed: str = ""
@@ -30,6 +58,26 @@ class ActivityResponse(ActivityCreate):
     id: str
     project_id: str
 
+# One step of a batch: create needs activity; update needs id and activity;
+# delete needs id; reorder needs id and sequence, and moves sections when given one
+class ActivityOperation(BaseModel):
+    op: ActivityOperationStr
+    id: Optional[str] = None
+    activity: Optional[ActivityCreate] = None
+    sequence: Optional[int] = None
+    section: Optional[ActivitySectionStr] = None
+
+class ActivityBatch(BaseModel):
+    operations: List[ActivityOperation] = Field(..., max_length=1000)
+    # When given, the batch is rejected with 409 unless the project is still at this version
+    base_version: Optional[int] = None
+
+class ActivityBatchResult(BaseModel):
+    version: int
+    created: List[ActivityResponse] = []
+    updated: List[ActivityResponse] = []
+    deleted: List[str] = []
+
 class ProjectCreate(BaseModel):
     title: str
     start_date: Optional[date] = None
@@ -43,4 +91,28 @@ class ProjectResponse(ProjectCreate):
     id: str
     created_at: str
     updated_at: str
+    version: int = 1
     activities: List[ActivityResponse] = []
+
+class ProjectSummary(ProjectCreate):
+    id: str
+    created_at: str
+    updated_at: str
+    activity_count: int
+    total_budget: float
+    finish_date: Optional[date] = None
+
+class ProjectPage(BaseModel):
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None
+
+class ExportJobResponse(BaseModel):
+    id: str
+    project_id: str
+    status: ExportJobStatusStr
+    progress: int
+    filename: str
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    download_url: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,592 @@
+"""
+Async data access for the API routes.
+
+AsyncDatabase hands out connections with the same methods from one of two backends:
+a pool of aiosqlite connections for the local database, or one shared async libsql
+client for Turso. With a local read replica of Turso configured it uses both, reading
+from the pool and writing through the client. ProjectRepository holds every query the
+routes run, so routes never see which backend is in use. Scripts and schema migrations
+keep using the blocking connections in database.py.
+"""
+
+import asyncio
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional, Sequence
+
+from database import (TURSO_URL, TURSO_TOKEN, TURSO_REPLICA_PATH, TURSO_REPLICA_SYNC_SECONDS, SQLITE_POOL_SIZE,
+                      SQLITE_BUSY_TIMEOUT_MS, SQLITE_POOL_TIMEOUT, ensure_schema, get_db_path, init_replica)
+from gantt_cache import gantt_cache
+from models import DashboardSortStr, SortOrderStr
+
+ACTIVITY_COLUMNS = ('id', 'project_id', 'task', 'action_needed', 'duration', 'precursor', 'sequence', 'resources', 'budget', 'section')
+INSERT_ACTIVITY_SQL = f"INSERT INTO activities ({', '.join(ACTIVITY_COLUMNS)}) VALUES ({', '.join('?' * len(ACTIVITY_COLUMNS))})"
+INSERT_PROJECT_SQL = "INSERT INTO projects (id, title, start_date, calendar_format, logo_path) VALUES (?, ?, ?, ?, ?)"
+UPDATE_ACTIVITY_SQL = ("UPDATE activities SET task = ?, action_needed = ?, duration = ?, precursor = ?, sequence = ?, "
+                       "resources = ?, budget = ?, section = ? WHERE id = ? AND project_id = ?")
+REORDER_ACTIVITY_SQL = "UPDATE activities SET sequence = ?, section = COALESCE(?, section) WHERE id = ? AND project_id = ?"
+DELETE_ACTIVITY_SQL = "DELETE FROM activities WHERE id = ? AND project_id = ?"
+SELECT_PROJECT_SQL = "SELECT * FROM projects WHERE id = ?"
+SELECT_ACTIVITIES_SQL = "SELECT * FROM activities WHERE project_id = ?"
+SELECT_PROJECT_VERSION_SQL = "SELECT version FROM projects WHERE id = ?"
+# Inserts nothing when the project does not exist; Turso does not enforce the foreign key
+INSERT_PROJECT_ACTIVITY_SQL = (f"INSERT INTO activities ({', '.join(ACTIVITY_COLUMNS)}) "
+                               f"SELECT {', '.join('?' * len(ACTIVITY_COLUMNS))} "
+                               f"WHERE EXISTS (SELECT 1 FROM projects WHERE id = ?)")
+
+def _placeholders(count: int) -> str:
+    return ', '.join('?' * count)
+
+def _is_constraint_error(error: Exception) -> bool:
+    """A constraint violation from sqlite3 or from the libsql client"""
+    return isinstance(error, sqlite3.IntegrityError) or getattr(error, 'code', '').startswith('SQLITE_CONSTRAINT')
+
+def _version_bump_sql(target_count: int) -> str:
+    """Bump a project's version; args are (base_version, base_version, *target_ids,
+    target_count, project_id), without the target ids and count when there are none.
+    The new version is NULL, which the NOT NULL constraint rejects so that the whole
+    transaction (or Turso batch) fails, when the project is no longer at base_version
+    (None skips that check) or when a target id is not one of its activities. Both are
+    checked by the write itself, so concurrent batches cannot all pass them."""
+    condition = "(? IS NULL OR version = ?)"
+    if target_count:
+        condition += (f" AND (SELECT COUNT(*) FROM activities WHERE project_id = projects.id "
+                      f"AND id IN ({_placeholders(target_count)})) = ?")
+    return (f"UPDATE projects SET version = CASE WHEN {condition} THEN version + 1 END, "
+            "updated_at = CURRENT_TIMESTAMP WHERE id = ?")
+
+# Per-project activity count, total budget and finish date, all from aggregates over the
+# projects selected by page_sql. The finish date matches the Gantt chart: post-kickoff
+# sequences run back to back for their longest activity, and
+# ScheduleCalculator.apply_calendar_format turns working days into calendar days.
+def _project_summary_sql(page_sql: str, order_by: str = "") -> str:
+    return f"""
+WITH page AS ({page_sql}), totals AS (
+    SELECT project_id, COUNT(*) AS activity_count
+    FROM activities WHERE project_id IN (SELECT id FROM page) GROUP BY project_id
+), sequence_spans AS (
+    SELECT project_id, MAX(duration) AS span
+    FROM activities WHERE project_id IN (SELECT id FROM page) AND section = 'Post Kick-off Activities'
+    GROUP BY project_id, sequence
+), working_days AS (
+    SELECT project_id, SUM(span) AS days FROM sequence_spans GROUP BY project_id
+)
+SELECT p.*,
+    COALESCE(t.activity_count, 0) AS activity_count,
+    date(p.start_date, '+' || CASE p.calendar_format
+        WHEN '5-day week' THEN COALESCE(w.days, 0) + COALESCE(w.days, 0) / 5 * 2
+        WHEN '6-day week' THEN COALESCE(w.days, 0) + COALESCE(w.days, 0) / 6
+        ELSE COALESCE(w.days, 0)
+    END || ' days') AS finish_date
+FROM page p
+LEFT JOIN totals t ON t.project_id = p.id
+LEFT JOIN working_days w ON w.project_id = p.id
+{order_by}
+"""
+
+PROJECT_SUMMARY_SQL = _project_summary_sql("SELECT * FROM projects")
+
+# Dashboard sort keys, each matching the expression of an index in database.MIGRATIONS
+DASHBOARD_SORT_KEYS = {
+    DashboardSortStr.TITLE: "title COLLATE NOCASE",
+    DashboardSortStr.START_DATE: "IFNULL(start_date, '')",
+    DashboardSortStr.UPDATED_AT: "updated_at",
+    DashboardSortStr.TOTAL_BUDGET: "total_budget",
+}
+
+def _dashboard_sql(sort: DashboardSortStr, order: SortOrderStr, limit: int, after=None, q: Optional[str] = None):
+    """SQL and arguments for one dashboard page; after is the decoded (sort_value, id) cursor"""
+    sort_key = DASHBOARD_SORT_KEYS[sort]
+    direction = "DESC" if order == SortOrderStr.DESC else "ASC"
+
+    where = []
+    args = []
+    if q:
+        # Title prefix as a range, so the NOCASE title index can serve it
+        where.append("title >= ? COLLATE NOCASE AND title < ? COLLATE NOCASE")
+        args += [q, q + "\U0010ffff"]
+    if after:
+        # Keyset pagination: continue strictly after the last row of the previous page
+        # (written without row values, which SQLite cannot match to the expression indexes)
+        sort_value, project_id = after
+        op = '<' if order == SortOrderStr.DESC else '>'
+        where.append(f"{sort_key} {op}= ? AND ({sort_key} {op} ? OR id {op} ?)")
+        args += [sort_value, sort_value, project_id]
+
+    order_by = f"ORDER BY sort_value {direction}, id {direction}"
+    page_sql = (f"SELECT *, {sort_key} AS sort_value FROM projects"
+                f"{' WHERE ' + ' AND '.join(where) if where else ''} {order_by} LIMIT ?")
+    # One extra row tells whether there is a next page
+    args.append(limit + 1)
+    return _project_summary_sql(page_sql, order_by), args
+
+
+class AsyncSQLiteConnection:
+    """An aiosqlite connection; each runs its queries on its own thread"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def fetchone(self, sql, args=()):
+        async with self.conn.execute(sql, args) as cursor:
+            return await cursor.fetchone()
+
+    async def fetchall(self, sql, args=()):
+        async with self.conn.execute(sql, args) as cursor:
+            return await cursor.fetchall()
+
+    async def execute(self, sql, args=()):
+        """Run one statement and commit it"""
+        await self.conn.execute(sql, args)
+        await self.conn.commit()
+
+    async def execute_batch(self, statements, reads=()):
+        """Run [(sql, [args, ...]), ...] and then the reads [(sql, args), ...] in one
+        transaction; returns the rows of each read"""
+        results = []
+        try:
+            if any(rows for _, rows in statements):
+                # Take the write lock up front, so checks made by the writes hold until commit
+                await self.conn.execute("BEGIN IMMEDIATE")
+            for sql, rows in statements:
+                await self.conn.executemany(sql, rows)
+            for sql, args in reads:
+                results.append(await self.fetchall(sql, args))
+        except Exception:
+            await self.conn.rollback()
+            raise
+        await self.conn.commit()
+        return results
+
+
+class AsyncTursoConnection:
+    """The async libsql client; rows come back as dicts, like DBConnectionWrapper's"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def _execute(self, sql, args):
+        return await self.client.execute(sql, list(args))
+
+    async def fetchone(self, sql, args=()):
+        result = await self._execute(sql, args)
+        if result.rows and hasattr(result, 'columns'):
+            return dict(zip(result.columns, result.rows[0]))
+        return None
+
+    async def fetchall(self, sql, args=()):
+        result = await self._execute(sql, args)
+        if not hasattr(result, 'columns'):
+            return []
+        return [dict(zip(result.columns, row)) for row in result.rows]
+
+    async def execute(self, sql, args=()):
+        await self._execute(sql, args)
+
+    async def execute_batch(self, statements, reads=()):
+        # One Turso batch, like DBConnectionWrapper.executemany
+        def build():
+            batch = [(sql, list(args)) for sql, rows in statements for args in rows]
+            batch.extend((sql, list(args)) for sql, args in reads)
+            return batch
+
+        if all(isinstance(rows, (list, tuple)) for _, rows in statements):
+            batch = build()
+        else:
+            # Rows from an iterator may be parsed as they are read (an import), so the
+            # batch is collected off the event loop
+            batch = await asyncio.to_thread(build)
+        results = await self.client.batch(batch) if batch else []
+        return [[dict(zip(result.columns, row)) for row in result.rows] for result in results[len(results) - len(reads):]]
+
+
+# Project ids per request when copying changed projects into a read replica
+REPLICA_SYNC_CHUNK = 200
+
+
+class ReplicaConnection:
+    """Reads from a local replica, writes to the Turso primary. After a write the replica
+    is synced before the call returns, so the request (and every later one in this
+    process) reads its own writes."""
+
+    def __init__(self, replica, primary, database):
+        self.replica = replica
+        self.primary = primary
+        self.database = database
+
+    async def fetchone(self, sql, args=()):
+        return await self.replica.fetchone(sql, args)
+
+    async def fetchall(self, sql, args=()):
+        return await self.replica.fetchall(sql, args)
+
+    async def execute(self, sql, args=()):
+        await self.primary.execute(sql, args)
+        await self.database.sync_replica(self.replica, force=True)
+
+    async def execute_batch(self, statements, reads=()):
+        if not any(rows for _, rows in statements):
+            return await self.replica.execute_batch([], reads)
+        # Reads that follow writes must see them, so they run on the primary in the same batch.
+        # A failed batch syncs too: it may have been rejected by a write the replica lacks.
+        try:
+            return await self.primary.execute_batch(statements, reads)
+        finally:
+            await self.database.sync_replica(self.replica, force=True)
+
+
+class AsyncDatabase:
+    """Process-wide async database access: a pool of aiosqlite connections, or one
+    long-lived async Turso client. With TURSO_REPLICA_PATH set as well, it is both: the
+    pool serves reads from the local replica and the client takes the writes.
+
+    Both are bound to the event loop that created them; if requests start arriving on
+    a different loop (as with a test client), the old ones are dropped and recreated.
+    """
+
+    def __init__(self, path=None, size=SQLITE_POOL_SIZE, busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+                 timeout=SQLITE_POOL_TIMEOUT, replica_path=TURSO_REPLICA_PATH,
+                 replica_sync_seconds=TURSO_REPLICA_SYNC_SECONDS):
+        self.path = path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.timeout = timeout
+        self.replica_path = replica_path if TURSO_URL and TURSO_TOKEN else None
+        self.replica_sync_seconds = replica_sync_seconds
+        self._loop = None
+        self._idle = None
+        self._created = 0
+        self._turso = None
+        self._schema_checked = False
+        self._sync_lock = None
+        self._synced_at = None
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._discard()
+        self._loop = loop
+        self._idle = asyncio.LifoQueue()
+        self._sync_lock = asyncio.Lock()
+
+    def _discard(self):
+        # Stop the worker threads of connections left on a previous loop without awaiting them
+        while self._idle is not None and not self._idle.empty():
+            self._idle.get_nowait().conn.stop()
+        self._idle = None
+        self._created = 0
+        self._turso = None
+
+    async def _connect(self):
+        import aiosqlite
+        # Each connection runs a worker thread until close(), which the app's lifespan
+        # shutdown calls; scripts using the pool close it themselves
+        conn = await aiosqlite.connect(self.replica_path or self.path or get_db_path(), cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        return AsyncSQLiteConnection(conn)
+
+    async def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if self._created < self.size:
+            self._created += 1
+            try:
+                return await self._connect()
+            except Exception:
+                self._created -= 1
+                raise
+        try:
+            return await asyncio.wait_for(self._idle.get(), self.timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No database connection free after {self.timeout} seconds")
+
+    async def _release(self, conn):
+        # Never hand a connection with an open transaction to the next request
+        if conn.conn.in_transaction:
+            await conn.conn.rollback()
+        self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection for the duration of the async with block"""
+        self._bind_loop()
+        if not self._schema_checked:
+            # The first request of the process brings the schema up to date, off the event loop
+            await asyncio.to_thread(ensure_schema)
+            if self.replica_path:
+                await asyncio.to_thread(init_replica, self.replica_path)
+            self._schema_checked = True
+        if TURSO_URL and TURSO_TOKEN:
+            if self._turso is None:
+                import libsql_client
+                self._turso = AsyncTursoConnection(libsql_client.create_client(url=TURSO_URL, auth_token=TURSO_TOKEN))
+            if not self.replica_path:
+                yield self._turso
+                return
+        conn = await self._acquire()
+        try:
+            if self.replica_path:
+                await self.sync_replica(conn)
+                yield ReplicaConnection(conn, self._turso, self)
+            else:
+                yield conn
+        finally:
+            await self._release(conn)
+
+    async def sync_replica(self, replica, force=False):
+        """Bring the replica up to date with the primary: unless forced, only when the last
+        sync is older than replica_sync_seconds. Projects are compared by version, which
+        every write bumps, so only new, changed and deleted projects are copied."""
+        def fresh():
+            return not force and self._synced_at is not None \
+                and time.monotonic() - self._synced_at < self.replica_sync_seconds
+
+        # Reads skip the lock entirely while the replica is fresh
+        if fresh():
+            return
+        async with self._sync_lock:
+            if fresh():
+                return
+            started_at = time.monotonic()
+            primary_versions = {row['id']: row['version'] for row in await self._turso.fetchall(
+                "SELECT id, version FROM projects")}
+            replica_versions = {row['id']: row['version'] for row in await replica.fetchall(
+                "SELECT id, version FROM projects")}
+            stale = [project_id for project_id, version in replica_versions.items()
+                     if primary_versions.get(project_id) != version]
+            changed = [project_id for project_id, version in primary_versions.items()
+                       if replica_versions.get(project_id) != version]
+
+            projects, activities = [], []
+            for start in range(0, len(changed), REPLICA_SYNC_CHUNK):
+                chunk = changed[start:start + REPLICA_SYNC_CHUNK]
+                chunk_projects, chunk_activities = await self._turso.execute_batch([], reads=[
+                    (f"SELECT * FROM projects WHERE id IN ({_placeholders(len(chunk))})", chunk),
+                    (f"SELECT * FROM activities WHERE project_id IN ({_placeholders(len(chunk))})", chunk),
+                ])
+                projects += chunk_projects
+                activities += chunk_activities
+
+            statements = [("DELETE FROM projects WHERE id = ?", [(project_id,) for project_id in stale])]
+            if projects:
+                columns = list(projects[0])
+                statements += [
+                    (f"INSERT INTO projects ({', '.join(columns)}) VALUES ({_placeholders(len(columns))})",
+                     [tuple(p[column] for column in columns) for p in projects]),
+                    (INSERT_ACTIVITY_SQL, [tuple(a[column] for column in ACTIVITY_COLUMNS) for a in activities]),
+                    # The budget triggers added the copied activities on top of the copied
+                    # total; put back the primary's value
+                    ("UPDATE projects SET total_budget = ? WHERE id = ?",
+                     [(p['total_budget'], p['id']) for p in projects]),
+                ]
+            # Deleting a project cascades to its activities
+            await replica.execute_batch(statements)
+            self._synced_at = started_at
+
+    @asynccontextmanager
+    async def repository(self):
+        async with self.connection() as conn:
+            yield ProjectRepository(conn)
+
+    async def close(self):
+        if self._turso is not None:
+            await self._turso.client.close()
+            self._turso = None
+        while self._idle is not None and not self._idle.empty():
+            await self._idle.get_nowait().conn.close()
+        self._created = 0
+
+
+class ActivityBatchRejected(Exception):
+    """An activity batch made against a stale version, or naming activities the project
+    does not have; version and missing are as read after the batch was rolled back"""
+
+    def __init__(self, version: Optional[int], missing: Sequence[str]):
+        super().__init__(f"Activity batch rejected at version {version}; missing {list(missing)}")
+        self.version = version
+        self.missing = missing
+
+
+class ProjectRepository:
+    """Every query the API runs, over one borrowed async connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    # Statements that run together go through execute_batch: on Turso that is one round
+    # trip, where each awaited query would be its own request
+
+    async def get_project(self, project_id: str):
+        return await self.conn.fetchone(SELECT_PROJECT_SQL, (project_id,))
+
+    async def get_activities(self, project_id: str):
+        return await self.conn.fetchall(SELECT_ACTIVITIES_SQL, (project_id,))
+
+    async def get_project_with_activities(self, project_id: str):
+        """The project row (or None) and its activities, read together"""
+        projects, activities = await self.conn.execute_batch([], reads=[
+            (SELECT_PROJECT_SQL, (project_id,)),
+            (SELECT_ACTIVITIES_SQL, (project_id,)),
+        ])
+        return (projects[0] if projects else None), activities
+
+    async def list_projects(self):
+        """Every project with its activities, in two queries"""
+        projects, activities = await self.conn.execute_batch([], reads=[
+            ("SELECT * FROM projects", ()),
+            ("SELECT * FROM activities", ()),
+        ])
+        by_project = {}
+        for a in activities:
+            by_project.setdefault(a['project_id'], []).append(dict(a))
+        result = []
+        for p in projects:
+            p_dict = dict(p)
+            p_dict['activities'] = by_project.get(p['id'], [])
+            result.append(p_dict)
+        return result
+
+    async def list_project_summaries(self):
+        return await self.conn.fetchall(PROJECT_SUMMARY_SQL)
+
+    async def dashboard_page(self, sort: DashboardSortStr, order: SortOrderStr, limit: int, after=None,
+                             q: Optional[str] = None):
+        sql, args = _dashboard_sql(sort, order, limit, after, q)
+        return await self.conn.fetchall(sql, args)
+
+    async def create_project(self, project_id: str, title: str, start_date: Optional[str], calendar_format: str,
+                             logo_path: Optional[str]):
+        (projects,) = await self.conn.execute_batch([
+            (INSERT_PROJECT_SQL, [(project_id, title, start_date, calendar_format, logo_path)]),
+        ], reads=[(SELECT_PROJECT_SQL, (project_id,))])
+        return projects[0]
+
+    async def import_project(self, project_id: str, title: str, start_date: Optional[str], calendar_format: str,
+                             logo_path: Optional[str], activity_rows: Iterable[Sequence]):
+        """Insert a project and its activities together (one transaction, or one Turso batch)
+        and read both back. activity_rows may be a generator: it is consumed inside the
+        transaction, so an error it raises rolls the whole import back."""
+        projects, activities = await self.conn.execute_batch([
+            (INSERT_PROJECT_SQL, [(project_id, title, start_date, calendar_format, logo_path)]),
+            (INSERT_ACTIVITY_SQL, activity_rows),
+        ], reads=[(SELECT_PROJECT_SQL, (project_id,)), (SELECT_ACTIVITIES_SQL, (project_id,))])
+        return projects[0], activities
+
+    async def update_project(self, project_id: str, title: str, start_date: Optional[str], calendar_format: str,
+                             logo_path: Optional[str]):
+        (projects,) = await self.conn.execute_batch([(
+            "UPDATE projects SET title = ?, start_date = ?, calendar_format = ?, logo_path = ?, "
+            "version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [(title, start_date, calendar_format, logo_path, project_id)]
+        )], reads=[(SELECT_PROJECT_SQL, (project_id,))])
+        gantt_cache.invalidate(project_id)
+        return projects[0] if projects else None
+
+    async def delete_project(self, project_id: str):
+        await self.conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        gantt_cache.invalidate(project_id)
+
+    # Every change to a project's activities goes through apply_activity_batch, so each
+    # one bumps the project version and drops the project's cached Gantt payload
+
+    async def add_activity(self, row: Sequence):
+        """Insert one activity from a row in ACTIVITY_COLUMNS order; raises ActivityBatchRejected
+        when there is no such project"""
+        _, created, _ = await self.apply_activity_batch(row[1], created_rows=[tuple(row)])
+        return created[0]
+
+    async def delete_activity(self, project_id: str, activity_id: str):
+        try:
+            await self.apply_activity_batch(project_id, deleted_ids=[activity_id])
+        except ActivityBatchRejected:
+            # Deleting an activity (or a project's) that is already gone is not an error
+            pass
+
+    async def get_project_version(self, project_id: str):
+        row = await self.conn.fetchone(SELECT_PROJECT_VERSION_SQL, (project_id,))
+        return row['version'] if row else None
+
+    async def missing_activities(self, project_id: str, activity_ids: Sequence[str]):
+        """The ids in activity_ids that are not activities of the project"""
+        if not activity_ids:
+            return []
+        rows = await self.conn.fetchall(
+            f"SELECT id FROM activities WHERE project_id = ? AND id IN ({_placeholders(len(activity_ids))})",
+            (project_id, *activity_ids)
+        )
+        found = {row['id'] for row in rows}
+        return [activity_id for activity_id in activity_ids if activity_id not in found]
+
+    async def apply_activity_batch(self, project_id: str, created_rows: Sequence[Sequence] = (),
+                                   updated_rows: Sequence[Sequence] = (), reordered: Sequence[Sequence] = (),
+                                   deleted_ids: Sequence[str] = (), base_version: Optional[int] = None):
+        """Apply activity changes and bump the project version, all in one transaction (or
+        one Turso batch). created_rows are in ACTIVITY_COLUMNS order; updated_rows are
+        (id, task, action_needed, duration, precursor, sequence, resources, budget, section);
+        reordered are (id, sequence, section or None). Returns the version this batch wrote
+        and the created and updated rows as stored; a batch with no changes writes nothing
+        and returns the current version.
+
+        Raises ActivityBatchRejected, having changed nothing, when there is no such project,
+        the project is not at base_version (if given) or an updated, reordered or deleted id
+        is not one of its activities."""
+        if not (created_rows or updated_rows or reordered or deleted_ids):
+            version = await self.get_project_version(project_id)
+            if version is None or (base_version is not None and base_version != version):
+                raise ActivityBatchRejected(version, [])
+            return version, [], []
+        
+        targeted = [row[0] for row in updated_rows] + [row[0] for row in reordered] + list(deleted_ids)
+        changed_ids = [row[0] for row in created_rows] + [row[0] for row in updated_rows] + [row[0] for row in reordered]
+        reads = [(SELECT_PROJECT_VERSION_SQL, (project_id,))]
+        if changed_ids:
+            reads.append((f"SELECT * FROM activities WHERE id IN ({_placeholders(len(changed_ids))})", changed_ids))
+        bump_args = (base_version, base_version, *targeted, *((len(targeted),) if targeted else ()), project_id)
+        try:
+            versions, *changed_rows = await self.conn.execute_batch([
+                # First, so its checks see the project as it was before this batch
+                (_version_bump_sql(len(targeted)), [bump_args]),
+                (DELETE_ACTIVITY_SQL, [(activity_id, project_id) for activity_id in deleted_ids]),
+                (UPDATE_ACTIVITY_SQL, [(*row[1:], row[0], project_id) for row in updated_rows]),
+                (REORDER_ACTIVITY_SQL, [(sequence, section, activity_id, project_id) for activity_id, sequence, section in reordered]),
+                (INSERT_PROJECT_ACTIVITY_SQL, [(*row, project_id) for row in created_rows]),
+            ], reads=reads)
+        except Exception as e:
+            if not _is_constraint_error(e):
+                raise
+            # Only a failed guard is a rejection; any other constraint failure is an error
+            version = await self.get_project_version(project_id)
+            missing = await self.missing_activities(project_id, targeted)
+            if version is not None and base_version in (None, version) and not missing:
+                raise
+            raise ActivityBatchRejected(version, missing) from e
+        if not versions:
+            # No such project: every statement above was scoped to it, so nothing was written
+            raise ActivityBatchRejected(None, [])
+        gantt_cache.invalidate(project_id)
+
+        if base_version is not None:
+            version = base_version + 1
+        else:
+            # Read in the batch's own transaction, so no other write can come between
+            version = versions[0]['version']
+        changed = {row['id']: dict(row) for rows in changed_rows for row in rows}
+        created = [changed[row[0]] for row in created_rows if row[0] in changed]
+        updated = [changed[activity_id] for activity_id in changed_ids[len(created_rows):] if activity_id in changed]
+        return version, created, updated
+
+
+async_db = AsyncDatabase()
+
+async def get_repository():
+    """FastAPI dependency: a repository over a pooled connection, returned after the request"""
+    async with async_db.repository() as repo:
+        yield repo
@@ -0,0 +1,87 @@
+"""
+JSON responses for the API's large payloads: full projects and Gantt data.
+
+Routes return json_response(...) directly, which skips FastAPI's validation and encoding
+of the route's response_model (the model stays on the route for the OpenAPI schema).
+project_content builds the ProjectResponse shape straight from database rows, which the
+schema already guarantees. Bodies are encoded with orjson when it is installed, and
+gzipped when the client accepts it and the body is large enough to be worth it.
+"""
+
+import gzip
+import json
+import os
+from typing import Optional
+
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+
+from models import ProjectResponse, ActivityResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+
+PROJECT_FIELDS = tuple(name for name in ProjectResponse.model_fields if name != 'activities')
+ACTIVITY_FIELDS = tuple(ActivityResponse.model_fields)
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def project_content(project, activities=()) -> dict:
+    """A ProjectResponse as a dict, from a projects row and its activities rows"""
+    content = {name: project[name] for name in PROJECT_FIELDS}
+    content['activities'] = [{name: activity[name] for name in ACTIVITY_FIELDS} for activity in activities]
+    return content
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether Accept-Encoding allows gzip: an explicit gzip entry decides, else "*" does"""
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for coding in accept_encoding.split(','):
+        name, *params = coding.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    for name in ('gzip', 'x-gzip', '*'):
+        if name in qualities:
+            return qualities[name] > 0
+    return False
+
+
+def gzip_etag(etag: str) -> str:
+    """The ETag of a gzipped body. Its bytes differ from the identity body's, so it needs
+    a strong validator of its own: "v3" becomes "v3-gz"."""
+    return f'{etag[:-1]}-gz"'
+
+
+async def json_response(content=None, accept_encoding: Optional[str] = None, headers: Optional[dict] = None,
+                        body: Optional[bytes] = None) -> Response:
+    """Respond with content, or with body when it is already encoded JSON"""
+    if body is None:
+        body = dumps(content)
+    headers = dict(headers or {})
+    headers['Vary'] = 'Accept-Encoding'
+    if len(body) >= GZIP_MINIMUM_SIZE and accepts_gzip(accept_encoding):
+        # mtime=0 keeps the compressed bytes identical for identical bodies
+        body = await run_in_threadpool(gzip.compress, body, GZIP_LEVEL, mtime=0)
+        headers['Content-Encoding'] = 'gzip'
+        if 'ETag' in headers:
+            headers['ETag'] = gzip_etag(headers['ETag'])
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,11 @@
+"""
+Versions of what core_logic computes, kept apart from it so the API can tag cached
+results without importing core_logic (and openpyxl) on the request path.
+"""
+
+# Bump whenever ExcelGenerator output changes so cached workbooks are regenerated
+GENERATOR_VERSION = "4"
+
+# Bump whenever GanttChartGenerator's scheduling, or the Gantt payload the API builds
+# from it, changes; it is part of the Gantt ETag and the Gantt cache tag
+GANTT_VERSION = "1"
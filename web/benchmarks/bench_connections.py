@@ -0,0 +1,61 @@
+"""
+Per-request cost of opening a fresh SQLite connection versus borrowing one from the
+API's async pool (repository.AsyncDatabase).
+
+Usage: python web/benchmarks/bench_connections.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Use a throwaway database rather than the API's local one
+os.environ["VERCEL"] = "1"
+os.environ.pop("TURSO_DATABASE_URL", None)
+tempfile.tempdir = tempfile.mkdtemp(prefix="psp_bench_")
+
+import common  # noqa: F401  (import path setup)
+
+from repository import AsyncDatabase, async_db
+
+
+async def fetch_with_new_connection(project_id: str):
+    # A one-connection database opens (and configures) its connection on first use
+    database = AsyncDatabase(size=1)
+    try:
+        async with database.repository() as repo:
+            await repo.get_project(project_id)
+    finally:
+        await database.close()
+
+
+async def fetch_with_pool(project_id: str):
+    async with async_db.repository() as repo:
+        await repo.get_project(project_id)
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    project_id = str(uuid.uuid4())
+    try:
+        async with async_db.repository() as repo:
+            await repo.create_project(project_id, "Benchmark", None, "5-day week", None)
+
+        print(f"{'connection':>12} {'per request (µs)':>17}")
+        for name, fetch in (("new", fetch_with_new_connection), ("pooled", fetch_with_pool)):
+            start = time.perf_counter()
+            for _ in range(requests):
+                await fetch(project_id)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>12} {elapsed / requests * 1e6:>17.1f}")
+    finally:
+        # The pool's worker threads would otherwise keep the interpreter alive
+        await async_db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+Time ExcelLoader.load_project on exported workbooks of increasing size, reading the
+embedded manifest and, for comparison, scanning the schedule sheet.
+
+Usage: python web/benchmarks/bench_excel_import.py [activity counts...]
+"""
+
+import os
+import sys
+import tempfile
+
+from common import API_DIR, make_project, timed
+
+from core_logic import ExcelGenerator, ExcelLoader
+
+
+class ScanningLoader(ExcelLoader):
+    """Ignores the manifest, as for a hand-edited workbook"""
+
+    def _read_manifest(self):
+        return None
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [50, 200, 500]
+    os.chdir(API_DIR)
+
+    print(f"{'activities':>10} {'file (KiB)':>11} {'manifest (ms)':>14} {'scan (ms)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            path = os.path.join(directory, f"plan_{count}.xlsx")
+            timed(lambda: ExcelGenerator(make_project(count)).generate(path), repeat=1)
+            manifest_seconds, project = timed(lambda: ExcelLoader(path).load_project())
+            assert len(project.activities) == count
+            scan_seconds, project = timed(lambda: ScanningLoader(path).load_project())
+            assert len(project.activities) == count
+            print(f"{count:>10} {os.path.getsize(path) / 1024:>11.1f} "
+                  f"{manifest_seconds * 1000:>14.0f} {scan_seconds * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
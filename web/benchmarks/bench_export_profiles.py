@@ -0,0 +1,35 @@
+"""
+Time and size of a workbook export for each ExportProfile.
+
+Usage: python web/benchmarks/bench_export_profiles.py [activity counts...]
+"""
+
+import io
+import os
+import sys
+
+from common import API_DIR, make_project, timed
+
+from core_logic import ExcelGenerator, ExportProfile
+
+
+def export(activity_count: int, profile: ExportProfile) -> int:
+    buffer = io.BytesIO()
+    ExcelGenerator(make_project(activity_count), profile=profile).generate(buffer)
+    return buffer.tell()
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [50, 200, 500]
+    # Resolve the default logo the same way the API does
+    os.chdir(API_DIR)
+
+    print(f"{'activities':>10} {'profile':>10} {'time (ms)':>10} {'size (KiB)':>11}")
+    for count in counts:
+        for profile in ExportProfile:
+            seconds, size = timed(lambda: export(count, profile))
+            print(f"{count:>10} {profile.value:>10} {seconds * 1000:>10.0f} {size / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cold-start import report: runs `python -X importtime` on the API module in fresh
+interpreters and prints the total, the heaviest direct imports, and which of the
+modules only the export routes need were loaded anyway.
+
+Usage: python web/benchmarks/bench_import_time.py [runs] [module]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import API_DIR
+
+# Loaded by the upload, export and Gantt code paths, not by a cold start
+DEFERRED_MODULES = ("core_logic", "openpyxl", "PIL", "numpy")
+
+
+def import_times(module: str):
+    """{package: (self µs, cumulative µs, depth)} for one fresh interpreter importing module"""
+    env = dict(os.environ, VERCEL="1", TMPDIR=tempfile.mkdtemp(prefix="psp_bench_"))
+    env.pop("TURSO_DATABASE_URL", None)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=API_DIR, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(own), int(cumulative), depth)
+    return times
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    module = sys.argv[2] if len(sys.argv) > 2 else "index"
+
+    best = min((import_times(module) for _ in range(runs)), key=lambda times: times[module][1])
+    print(f"import {module}: {best[module][1] / 1000:.1f} ms (best of {runs})")
+
+    print(f"\n{'direct import':>24} {'cumulative (ms)':>16}")
+    direct = [(name, cumulative) for name, (_, cumulative, depth) in best.items() if depth == 1]
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:12]:
+        print(f"{name:>24} {cumulative / 1000:>16.1f}")
+
+    print(f"\n{'deferred module':>24} {'loaded':>8}")
+    for name in DEFERRED_MODULES:
+        print(f"{name:>24} {'yes' if name in best else 'no':>8}")
+
+
+if __name__ == "__main__":
+    main()
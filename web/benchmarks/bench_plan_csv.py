@@ -0,0 +1,65 @@
+"""
+Throughput and peak memory of the streaming execution-plan CSV parser.
+
+Usage: python web/benchmarks/bench_plan_csv.py [activity counts...]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import make_project
+
+from plan_csv import PlanCsvReader
+
+
+def write_plan(path: str, activity_count: int):
+    """Write a plan in the execution-plan layout: title, S/N header, section rows, budgets in millions"""
+    project = make_project(activity_count)
+    with open(path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow([project.title] + [""] * 8)
+        writer.writerow(["S/N", "ACTIVITIES/TASKS", "ACTION NEEDED", "DURATION", "PRECURSOR", "SEQUENCE",
+                         "SCHEDULE (Days)", "RESOURCES", "BUDGET (MILLION)"])
+        section = None
+        for number, activity in enumerate(project.activities, start=1):
+            if activity.section != section:
+                section = activity.section
+                writer.writerow(["", "PRE-KICKOFF ACTIVITIES" if number == 1 else "POST KICKOFF"] + [""] * 7)
+            writer.writerow([number, activity.task, activity.action_needed, activity.duration, activity.precursor,
+                             activity.sequence, "", activity.resources, f"{activity.budget / 1000000:,.2f}"])
+
+
+def parse(path: str) -> int:
+    with open(path, "r", encoding="utf-8-sig", newline="") as source:
+        return sum(1 for _ in PlanCsvReader(source, strict=True))
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000]
+
+    print(f"{'activities':>10} {'file (MiB)':>11} {'time (ms)':>10} {'rows/s':>10} {'peak (KiB)':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            path = os.path.join(directory, f"plan_{count}.csv")
+            write_plan(path, count)
+
+            start = time.perf_counter()
+            assert parse(path) == count
+            seconds = time.perf_counter() - start
+
+            # Separate run for memory: tracing slows parsing down
+            tracemalloc.start()
+            parse(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{count:>10} {os.path.getsize(path) / 1024 / 1024:>11.1f} {seconds * 1000:>10.0f} "
+                  f"{count / seconds:>10.0f} {peak / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
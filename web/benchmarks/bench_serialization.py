@@ -0,0 +1,98 @@
+"""
+Serialisation time and bytes on the wire for a large project and its Gantt data.
+
+Compares FastAPI's response_model path (validate, then encode with the standard library)
+with building the response from the database rows (responses.project_content) and
+encoding it with the standard library or with orjson, then gzips the result.
+
+Usage: python web/benchmarks/bench_serialization.py [activity count]
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Use a throwaway database rather than the API's local one
+os.environ["VERCEL"] = "1"
+os.environ.pop("TURSO_DATABASE_URL", None)
+tempfile.tempdir = tempfile.mkdtemp(prefix="psp_bench_")
+
+from common import make_project
+
+from pydantic import TypeAdapter
+
+import responses
+from index import _gantt_response
+from models import ProjectResponse
+from repository import ACTIVITY_COLUMNS
+
+
+def best_of(func, repeat: int = 5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def stdlib_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def database_rows(activity_count: int):
+    """The project and activity rows the API would read for a synthetic project"""
+    project = make_project(activity_count)
+    project_id = str(uuid.uuid4())
+    project_row = {
+        'id': project_id, 'title': project.title, 'start_date': project.start_date.isoformat(),
+        'calendar_format': project.calendar_format.value, 'logo_path': None,
+        'created_at': '2025-01-06 09:00:00', 'updated_at': '2025-01-06 09:00:00', 'version': 1,
+        'total_budget': sum(a.budget for a in project.activities),
+    }
+    activity_rows = [
+        dict(zip(ACTIVITY_COLUMNS, (str(uuid.uuid4()), project_id, a.task, a.action_needed, a.duration,
+                                    a.precursor, a.sequence, a.resources, a.budget, a.section.value)))
+        for a in project.activities
+    ]
+    return project_row, activity_rows
+
+
+def main():
+    activity_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    project_row, activity_rows = database_rows(activity_count)
+    adapter = TypeAdapter(ProjectResponse)
+
+    def response_model_path():
+        content = dict(project_row, activities=activity_rows)
+        return stdlib_dumps(adapter.dump_python(adapter.validate_python(content), mode="json"))
+
+    gantt_seconds, gantt = best_of(lambda: _gantt_response(project_row, activity_rows), repeat=1)
+
+    cases = [
+        ("project", "response_model + json", response_model_path),
+        ("project", "rows + json", lambda: stdlib_dumps(responses.project_content(project_row, activity_rows))),
+        ("project", "rows + orjson", lambda: responses.dumps(responses.project_content(project_row, activity_rows))),
+        ("gantt", "json", lambda: stdlib_dumps(gantt)),
+        ("gantt", "orjson", lambda: responses.dumps(gantt)),
+    ]
+
+    print(f"{activity_count} activities; computing the Gantt data took {gantt_seconds * 1000:.0f} ms "
+          f"(cached per project version after the first view)")
+    print(f"{'payload':>8} {'path':>22} {'encode (ms)':>12} {'bytes':>10} "
+          f"{'gzip (ms)':>10} {'gzip bytes':>11}")
+    for payload, name, encode in cases:
+        seconds, body = best_of(encode)
+        gzip_seconds, compressed = best_of(lambda: gzip.compress(body, responses.GZIP_LEVEL, mtime=0))
+        print(f"{payload:>8} {name:>22} {seconds * 1000:>12.1f} {len(body):>10,} "
+              f"{gzip_seconds * 1000:>10.1f} {len(compressed):>11,}")
+
+
+if __name__ == "__main__":
+    main()
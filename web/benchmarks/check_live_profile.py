@@ -0,0 +1,51 @@
+"""
+Checks that a live export can be edited where it recalculates: the "Project Schedule"
+sheet stays protected, the Duration (D) and Sequence (F) cells of every activity and
+the Review Comments column (K) are unlocked, and the Schedule formulas (G) stay
+locked. Exits non-zero on the first check that fails.
+
+Usage: python web/benchmarks/check_live_profile.py [activity count]
+"""
+
+import io
+import os
+import sys
+
+from common import API_DIR, make_project
+
+import openpyxl
+
+from core_logic import ExcelGenerator, ExportProfile
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    print(f"{'ok' if ok else 'FAIL':>4}  {name}{'  ' + detail if detail and not ok else ''}")
+    if not ok:
+        sys.exit(1)
+
+
+def main():
+    activity_count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    # Resolve the default logo the same way the API does
+    os.chdir(API_DIR)
+
+    buffer = io.BytesIO()
+    generator = ExcelGenerator(make_project(activity_count), profile=ExportProfile.LIVE)
+    generator.generate(buffer)
+    activity_rows = sorted(row for row, _ in generator.schedule_refs.values())
+    ws = openpyxl.load_workbook(buffer)["Project Schedule"]
+
+    def locked(column: str):
+        return [row for row in activity_rows if ws[f"{column}{row}"].protection.locked]
+
+    check("sheet is protected", ws.protection.sheet)
+    check(f"duration cells unlocked ({len(activity_rows)} activities)", not locked("D"), f"locked rows {locked('D')[:5]}")
+    check("sequence cells unlocked", not locked("F"), f"locked rows {locked('F')[:5]}")
+    check("review comments unlocked", not locked("K"), f"locked rows {locked('K')[:5]}")
+    formula_rows = [row for row in activity_rows if str(ws[f"G{row}"].value).startswith("=")]
+    check(f"schedule formulas locked ({len(formula_rows)} cells)",
+          bool(formula_rows) and all(ws[f"G{row}"].protection.locked for row in formula_rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Checks that the API's hot queries are served by the indexes the schema migrations
+create, using EXPLAIN QUERY PLAN on a freshly migrated database. Exits non-zero and
+prints the offending plan when a query misses its index or scans a whole table.
+
+Usage: python web/benchmarks/check_query_plans.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+# Use a throwaway database rather than the API's local one
+os.environ["VERCEL"] = "1"
+os.environ.pop("TURSO_DATABASE_URL", None)
+tempfile.tempdir = tempfile.mkdtemp(prefix="psp_plans_")
+
+import common  # noqa: F401  (import path setup)
+
+from database import SCHEMA_VERSION
+from repository import INSERT_ACTIVITY_SQL, INSERT_PROJECT_SQL, PROJECT_SUMMARY_SQL, _dashboard_sql, async_db
+from models import DashboardSortStr, SortOrderStr
+
+PROJECT_ID = str(uuid.uuid4())
+
+# (name, sql, args, index that must appear in the plan); only the unpaged summary
+# listing is expected to read every project
+CHECKS = [
+    ("project by id", "SELECT * FROM projects WHERE id = ?", (PROJECT_ID,), "sqlite_autoindex_projects_1"),
+    ("activities of a project", "SELECT * FROM activities WHERE project_id = ?", (PROJECT_ID,), "idx_activities_project"),
+    ("activities in schedule order",
+     "SELECT * FROM activities WHERE project_id = ? ORDER BY section, sequence", (PROJECT_ID,), "idx_activities_project"),
+    ("activity counts per project",
+     "SELECT project_id, COUNT(*) FROM activities GROUP BY project_id", (), "idx_activities_project"),
+    ("delete an activity", "DELETE FROM activities WHERE id = ? AND project_id = ?", ("", PROJECT_ID),
+     "sqlite_autoindex_activities_1"),
+    ("project summaries", PROJECT_SUMMARY_SQL, (), "idx_activities_project"),
+]
+
+for sort in DashboardSortStr:
+    for order in SortOrderStr:
+        index = f"idx_projects_{sort.value}"
+        sql, args = _dashboard_sql(sort, order, 24)
+        CHECKS.append((f"dashboard by {sort.value} {order.value}", sql, args, index))
+        sql, args = _dashboard_sql(sort, order, 24, after=("2025-01-01" if sort != DashboardSortStr.TOTAL_BUDGET else 0, PROJECT_ID))
+        CHECKS.append((f"dashboard by {sort.value} {order.value}, next page", sql, args, index))
+CHECKS.append(("dashboard title search", *_dashboard_sql(DashboardSortStr.TITLE, SortOrderStr.ASC, 24, q="Ben"),
+               "idx_projects_title"))
+
+
+async def populate(conn, projects: int = 200, activities_per_project: int = 20):
+    project_rows, activity_rows = [], []
+    for p in range(projects):
+        project_id = PROJECT_ID if p == 0 else str(uuid.uuid4())
+        project_rows.append((project_id, f"Benchmark {p}", f"2025-{p % 12 + 1:02d}-01", "5-day week", None))
+        for i in range(activities_per_project):
+            section = "Pre-Kickoff Activities" if i < 3 else "Post Kick-off Activities"
+            activity_rows.append((str(uuid.uuid4()), project_id, f"Activity {i}", "", 1 + i % 5, "", i // 3 + 1, "",
+                                  1000.0, section))
+    await conn.execute_batch([(INSERT_PROJECT_SQL, project_rows), (INSERT_ACTIVITY_SQL, activity_rows)])
+
+
+def problems(name: str, plan: list, index: str) -> list:
+    found = []
+    if not any(f"USING INDEX {index}" in line or f"USING COVERING INDEX {index}" in line for line in plan):
+        found.append(f"does not use {index}")
+    for line in plan:
+        if line in ("SCAN projects", "SCAN activities") and not (name == "project summaries" and line == "SCAN projects"):
+            found.append(f"full table scan: {line}")
+    return found
+
+
+async def main():
+    failures = 0
+    try:
+        # The API's own pool: its first connection migrates the throwaway database
+        async with async_db.connection() as conn:
+            row = await conn.fetchone("SELECT MAX(version) AS version FROM schema_version")
+            assert row['version'] == SCHEMA_VERSION
+            await populate(conn)
+
+            for name, sql, args, index in CHECKS:
+                plan = [row['detail'] for row in await conn.fetchall(f"EXPLAIN QUERY PLAN {sql}", args)]
+                found = problems(name, plan, index)
+                print(f"{'FAIL' if found else 'ok':>4}  {name}")
+                if found:
+                    failures += 1
+                    for problem in found:
+                        print(f"      {problem}")
+                    for line in plan:
+                        print(f"        {line}")
+    finally:
+        await async_db.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Checks that DBConnectionWrapper.pipeline() sends each flush as exactly one libsql batch,
+using a local file: database through the same client the API uses for Turso. Covers the
+schema migrations (on a new and on an up-to-date database), a pipeline read, and a
+pipeline discarded by an exception. Exits non-zero on the first check that fails.
+
+Usage: python web/benchmarks/check_turso_pipeline.py
+"""
+
+import os
+import sys
+import tempfile
+
+import common  # noqa: F401  (import path setup)
+
+from database import MIGRATIONS, SCHEMA_VERSION, DBConnectionWrapper, get_schema_version, migrate
+
+
+class CountingConnection(DBConnectionWrapper):
+    """Counts the requests sent to the client, and the flushes that had statements queued"""
+
+    def __init__(self, url):
+        super().__init__(url, "")
+        self.requests = []
+        self.flushes = 0
+        client = self.client
+        execute, batch = client.execute, client.batch
+
+        def counted_execute(sql, args=None):
+            self.requests.append(("execute", 1))
+            return execute(sql, args)
+
+        def counted_batch(statements):
+            self.requests.append(("batch", len(statements)))
+            return batch(statements)
+
+        client.execute, client.batch = counted_execute, counted_batch
+
+    def flush(self):
+        if self._queue():
+            self.flushes += 1
+        super().flush()
+
+    def reset(self):
+        self.requests, self.flushes = [], 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    print(f"{'ok' if ok else 'FAIL':>4}  {name}{'  ' + detail if detail else ''}")
+    if not ok:
+        sys.exit(1)
+
+
+def one_batch_per_flush(conn) -> bool:
+    return all(kind == "batch" for kind, _ in conn.requests) and len(conn.requests) == conn.flushes
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(prefix="psp_pipeline_"), "pipeline.db")
+    conn = CountingConnection(f"file://{path}")
+    try:
+        applied = migrate(conn)
+        check("migrate a new database", applied == [version for version, _, _ in MIGRATIONS],
+              f"{len(conn.requests)} requests for {len(applied)} migrations: {conn.requests}")
+        check("  one batch per flush", one_batch_per_flush(conn))
+
+        conn.reset()
+        check("migrate an up-to-date database", migrate(conn) == [] and conn.requests == [("batch", 2)],
+              f"{conn.requests}")
+        check("  schema version", get_schema_version(conn) == SCHEMA_VERSION)
+
+        conn.reset()
+        with conn.pipeline():
+            conn.execute("INSERT INTO projects (id, title) VALUES (?, ?)", ("p1", "Pipelined"))
+            conn.executemany("INSERT INTO projects (id, title) VALUES (?, ?)", [("p2", "Two"), ("p3", "Three")])
+            count = conn.execute("SELECT COUNT(*) AS n FROM projects").fetchone()['n']
+            check("pipeline read", count == 3 and conn.requests == [("batch", 4)], f"{conn.requests}")
+            conn.execute("UPDATE projects SET title = ? WHERE id = ?", ("Renamed", "p1"))
+        check("  one batch per flush", one_batch_per_flush(conn) and conn.flushes == 2, f"{conn.requests}")
+
+        conn.reset()
+        pending = None
+        try:
+            with conn.pipeline():
+                conn.execute("DELETE FROM projects")
+                pending = conn.execute("SELECT COUNT(*) AS n FROM projects")
+                raise ValueError
+        except ValueError:
+            pass
+        try:
+            pending.fetchone()
+            discarded = False
+        except RuntimeError:
+            discarded = True
+        remaining = conn.execute("SELECT COUNT(*) AS n FROM projects").fetchone()['n']
+        check("discarded pipeline", discarded and remaining == 3 and conn.requests == [("execute", 1)],
+              f"{conn.requests}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared helpers for the benchmark scripts: import path setup and synthetic projects.
+"""
+
+import contextlib
+import datetime
+import io
+import os
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+sys.path.insert(0, os.path.abspath(API_DIR))
+
+from core_logic import Project, Activity, ActivitySection, CalendarFormat
+
+
+def make_project(activity_count: int, calendar_format: CalendarFormat = CalendarFormat.SIX_DAY) -> Project:
+    """Build a project shaped like our real plans: a short pre-kickoff block, then
+    post-kickoff activities grouped three to a sequence"""
+    project = Project(
+        title=f"Benchmark Plan ({activity_count} activities)",
+        calendar_format=calendar_format,
+        start_date=datetime.date(2025, 1, 6)
+    )
+    pre_kickoff_count = min(10, activity_count // 10)
+    for i in range(activity_count):
+        section = ActivitySection.PRE_KICKOFF if i < pre_kickoff_count else ActivitySection.POST_KICKOFF
+        project.add_activity(Activity(
+            task=f"Activity {i + 1}: install and commission equipment lot {i % 37}",
+            action_needed="Coordinate with site team and vendor",
+            duration=1 + (i * 7) % 12,
+            precursor=f"Activity {i}" if i else "",
+            sequence=i // 3 + 1,
+            resources="Site engineer, Procurement",
+            budget=float((i % 25) * 250000),
+            section=section
+        ))
+    return project
+
+
+def timed(func, repeat: int = 3):
+    """Run func repeat times with its stdout silenced; return (best seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
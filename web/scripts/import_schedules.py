@@ -0,0 +1,178 @@
+"""
+Import an archive of generated schedule workbooks into a SQLite database.
+
+Workbooks are parsed with ExcelLoader across a process pool, and the main process
+writes them in batched transactions. Each file's outcome is recorded in a
+schedule_imports table, so an interrupted run picks up where it stopped. Files that
+changed since they were imported replace their earlier project.
+
+Usage: python web/scripts/import_schedules.py ARCHIVE_DIR [--db PATH] [--workers N]
+           [--pattern GLOB] [--batch-size N] [--retry-failed] [--report errors.csv]
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+sys.path.insert(0, os.path.abspath(API_DIR))
+
+from core_logic import Activity, ExcelLoader
+
+IMPORTED = "imported"
+FAILED = "failed"
+
+
+def parse_workbook(path: str):
+    """Worker: read one workbook into plain tuples. Returns (path, project, error)."""
+    try:
+        loader = ExcelLoader(path)
+        activities = [
+            (a.task, a.action_needed, a.duration, a.precursor, a.sequence, a.resources, a.budget, a.section.value)
+            for a in loader.iter_activities() if isinstance(a, Activity)
+        ]
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+    start_date = loader.start_date.isoformat() if loader.start_date else None
+    project = (loader.project_title, loader.calendar_format.value, start_date, activities)
+    return path, project, None
+
+
+def open_database(db_path: str) -> sqlite3.Connection:
+    """Open the SQLite database with the API schema plus the import progress table"""
+    from database import init_db
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    init_db(conn)
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_imports (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        status TEXT CHECK(status IN ('imported', 'failed')) NOT NULL,
+        project_id TEXT,
+        error TEXT,
+        imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.commit()
+    return conn
+
+
+def find_pending(conn: sqlite3.Connection, archive_dir: str, pattern: str, retry_failed: bool):
+    """Return [(path, size, mtime_ns)] for workbooks that are new, changed or (optionally) failed"""
+    import fnmatch
+
+    done = {
+        path: (size, mtime_ns, status)
+        for path, size, mtime_ns, status in conn.execute("SELECT path, size, mtime_ns, status FROM schedule_imports")
+    }
+    pending = []
+    for root, _, names in os.walk(archive_dir):
+        for name in sorted(fnmatch.filter(names, pattern)):
+            path = os.path.abspath(os.path.join(root, name))
+            stat = os.stat(path)
+            previous = done.get(path)
+            if previous and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+                if previous[2] == IMPORTED or not retry_failed:
+                    continue
+            pending.append((path, stat.st_size, stat.st_mtime_ns))
+    pending.sort()
+    return pending
+
+
+def write_batch(conn: sqlite3.Connection, results, stats):
+    """Write parsed workbooks and their progress rows in one transaction"""
+    from database import execute_batch
+
+    projects, activities, progress, stale = [], [], [], []
+    for (path, size, mtime_ns), (_, project, error) in results:
+        stale.append((path,))
+        if project is None:
+            progress.append((path, size, mtime_ns, FAILED, None, error))
+            continue
+        project_id = str(uuid.uuid4())
+        title, calendar_format, start_date, rows = project
+        projects.append((project_id, title, start_date, calendar_format, None))
+        activities.extend((str(uuid.uuid4()), project_id, *row) for row in rows)
+        progress.append((path, size, mtime_ns, IMPORTED, project_id, None))
+
+    execute_batch(conn, [
+        # A file seen again replaces (or, if it now fails, drops) the project it created last time
+        ("DELETE FROM projects WHERE id = (SELECT project_id FROM schedule_imports WHERE path = ?)", stale),
+        ("INSERT INTO projects (id, title, start_date, calendar_format, logo_path) VALUES (?, ?, ?, ?, ?)", projects),
+        ("""INSERT INTO activities
+        (id, project_id, task, action_needed, duration, precursor, sequence, resources, budget, section)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", activities),
+        ("""INSERT OR REPLACE INTO schedule_imports (path, size, mtime_ns, status, project_id, error)
+        VALUES (?, ?, ?, ?, ?, ?)""", progress),
+    ])
+    stats[IMPORTED] += len(projects)
+    stats[FAILED] += len(progress) - len(projects)
+    stats['activities'] += len(activities)
+
+
+def write_report(conn: sqlite3.Connection, report_path: str) -> int:
+    """Write every failed file and its error to a CSV report"""
+    failures = conn.execute(
+        "SELECT path, error, imported_at FROM schedule_imports WHERE status = ? ORDER BY path", (FAILED,)
+    ).fetchall()
+    with open(report_path, "w", newline="", encoding="utf-8") as report:
+        writer = csv.writer(report)
+        writer.writerow(["path", "error", "attempted_at"])
+        writer.writerows(failures)
+    return len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import an archive of schedule workbooks into SQLite")
+    parser.add_argument("archive_dir", help="directory to search for workbooks")
+    parser.add_argument("--db", help="SQLite database to import into (default: the API's local database)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parser processes")
+    parser.add_argument("--pattern", default="*_schedule.xlsx", help="file name pattern (case sensitive)")
+    parser.add_argument("--batch-size", type=int, default=50, help="workbooks written per transaction")
+    parser.add_argument("--retry-failed", action="store_true", help="parse files that failed last time again")
+    parser.add_argument("--report", help="write failed files and their errors to this CSV")
+    args = parser.parse_args()
+
+    if not args.db:
+        from database import get_db_path
+        args.db = get_db_path()
+
+    conn = open_database(args.db)
+    pending = find_pending(conn, args.archive_dir, args.pattern, args.retry_failed)
+    print(f"{len(pending)} workbook(s) to import into {args.db}")
+
+    stats = {IMPORTED: 0, FAILED: 0, 'activities': 0}
+    batch = []
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            paths = [path for path, _, _ in pending]
+            results = executor.map(parse_workbook, paths, chunksize=max(1, min(16, len(paths) // (4 * args.workers))))
+            for done, (entry, result) in enumerate(zip(pending, results), start=1):
+                batch.append((entry, result))
+                if len(batch) >= args.batch_size:
+                    write_batch(conn, batch, stats)
+                    batch = []
+                    print(f"  {done}/{len(pending)} processed", flush=True)
+    finally:
+        # Keep whatever was parsed before an interruption, so the next run skips it
+        if batch:
+            write_batch(conn, batch, stats)
+
+    print(f"Imported {stats[IMPORTED]} workbook(s) with {stats['activities']} activities, {stats[FAILED]} failed")
+    if args.report:
+        failures = write_report(conn, args.report)
+        print(f"Wrote {failures} failure(s) to {args.report}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,37 +3,68 @@
 import { useState, useEffect } from "react";
 import { format } from "date-fns";
 import { motion } from "framer-motion";
-import { Calendar, Clock, LayoutTemplate, Plus, Trash2, ArrowRight } from "lucide-react";
+import { Calendar, Clock, LayoutTemplate, Plus, Trash2, ArrowRight, Search } from "lucide-react";
 import toast from "react-hot-toast";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
 
-interface Project {
+interface ProjectSummary {
   id: string;
   title: string;
   start_date: string;
   calendar_format: string;
   created_at: string;
-  activities: any[];
+  activity_count: number;
+  total_budget: number;
+  finish_date: string | null;
 }
 
+interface ProjectPage {
+  items: ProjectSummary[];
+  next_cursor: string | null;
+}
+
+const SORT_OPTIONS = [
+  { value: "updated_at:desc", label: "Recently updated" },
+  { value: "title:asc", label: "Title (A–Z)" },
+  { value: "start_date:desc", label: "Start date (newest)" },
+  { value: "start_date:asc", label: "Start date (oldest)" },
+  { value: "total_budget:desc", label: "Budget (highest)" },
+];
+
+const PAGE_SIZE = 24;
+
 export default function GlobalDashboard() {
-  const [projects, setProjects] = useState<Project[]>([]);
+  const [projects, setProjects] = useState<ProjectSummary[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [sortOption, setSortOption] = useState(SORT_OPTIONS[0].value);
+  const [search, setSearch] = useState("");
   const router = useRouter();
 
   useEffect(() => {
-    fetchProjects();
-  }, []);
+    // Debounce typing in the search box
+    const timer = setTimeout(() => fetchProjects(), search ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [sortOption, search]);
+
+  // Summaries one page at a time, sorted and filtered by the API
+  const fetchPage = async (cursor: string | null): Promise<ProjectPage | null> => {
+    const [sort, order] = sortOption.split(":");
+    const params = new URLSearchParams({ sort, order, limit: String(PAGE_SIZE) });
+    if (search.trim()) params.set("q", search.trim());
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`/api/dashboard/projects?${params}`);
+    return res.ok ? res.json() : null;
+  };
 
   const fetchProjects = async () => {
     try {
-      // Artificial delay to make skeleton loading visible for better UX
-      await new Promise(r => setTimeout(r, 600));
-      const res = await fetch("/api/projects");
-      if (res.ok) {
-        const data = await res.json();
-        setProjects(data);
+      const page = await fetchPage(null);
+      if (page) {
+        setProjects(page.items);
+        setNextCursor(page.next_cursor);
       }
     } catch (error) {
       console.error("Failed to fetch projects", error);
@@ -42,6 +73,22 @@ export default function GlobalDashboard() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      if (page) {
+        setProjects(prev => [...prev, ...page.items]);
+        setNextCursor(page.next_cursor);
+      }
+    } catch (error) {
+      console.error("Failed to fetch projects", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const createProject = async () => {
     const promise = fetch("/api/projects", {
       method: "POST",
@@ -107,12 +154,38 @@ export default function GlobalDashboard() {
           </button>
         </header>
 
+        <div className="flex flex-col sm:flex-row gap-3">
+          <div className="relative flex-1">
+            <Search size={18} className="absolute left-3 top-1/2 -translate-y-1/2 text-slate-400" />
+            <input
+              type="text"
+              value={search}
+              onChange={(e) => setSearch(e.target.value)}
+              placeholder="Search by title..."
+              className="w-full pl-10 pr-4 py-2.5 rounded-xl border border-slate-200 dark:border-slate-800 bg-white dark:bg-slate-900 text-sm focus:outline-none focus:ring-2 focus:ring-[#006634]/40"
+            />
+          </div>
+          <select
+            value={sortOption}
+            onChange={(e) => setSortOption(e.target.value)}
+            className="px-4 py-2.5 rounded-xl border border-slate-200 dark:border-slate-800 bg-white dark:bg-slate-900 text-sm focus:outline-none focus:ring-2 focus:ring-[#006634]/40"
+          >
+            {SORT_OPTIONS.map(option => (
+              <option key={option.value} value={option.value}>{option.label}</option>
+            ))}
+          </select>
+        </div>
+
         {loading ? (
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {[1, 2, 3].map(i => (
               <div key={i} className="h-64 bg-slate-200 dark:bg-slate-800 rounded-2xl animate-pulse"></div>
             ))}
           </div>
+        ) : projects.length === 0 && search.trim() ? (
+          <div className="flex flex-col items-center justify-center h-64 text-slate-500">
+            <p>No projects with a title starting with &ldquo;{search.trim()}&rdquo;.</p>
+          </div>
         ) : projects.length === 0 ? (
           <div className="flex flex-col items-center justify-center h-96 border-2 border-dashed border-slate-300 dark:border-slate-800 rounded-3xl bg-slate-100/50 dark:bg-slate-900/50">
             <LayoutTemplate size={48} className="text-slate-400 mb-4" />
@@ -127,7 +200,7 @@ export default function GlobalDashboard() {
                 key={project.id}
                 initial={{ opacity: 0, y: 20 }}
                 animate={{ opacity: 1, y: 0 }}
-                transition={{ delay: idx * 0.1 }}
+                transition={{ delay: (idx % PAGE_SIZE) * 0.05 }}
               >
                 <Link href={`/projects/${project.id}`}>
                   <div className="group relative bg-white dark:bg-slate-900 rounded-2xl p-6 shadow-sm border border-slate-200 dark:border-slate-800 hover:shadow-xl hover:border-blue-500/50 transition-all duration-300 h-full flex flex-col cursor-pointer">
@@ -143,7 +216,10 @@ export default function GlobalDashboard() {
                     <div className="space-y-3 mt-auto">
                       <div className="flex items-center gap-3 text-sm text-slate-600 dark:text-slate-400">
                         <Calendar size={16} className="text-blue-500" />
-                        <span>{project.start_date ? format(new Date(project.start_date), "MMM d, yyyy") : "Not set"}</span>
+                        <span>
+                          {project.start_date ? format(new Date(project.start_date), "MMM d, yyyy") : "Not set"}
+                          {project.finish_date && project.activity_count > 0 && ` – ${format(new Date(project.finish_date), "MMM d, yyyy")}`}
+                        </span>
                       </div>
                       <div className="flex items-center gap-3 text-sm text-slate-600 dark:text-slate-400">
                         <Clock size={16} className="text-indigo-500" />
@@ -151,7 +227,7 @@ export default function GlobalDashboard() {
                       </div>
                       <div className="flex items-center gap-3 text-sm text-slate-600 dark:text-slate-400">
                         <LayoutTemplate size={16} className="text-purple-500" />
-                        <span>{project.activities?.length || 0} activities</span>
+                        <span>{project.activity_count} activities</span>
                       </div>
                     </div>
                     
@@ -165,6 +241,18 @@ export default function GlobalDashboard() {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-2.5 rounded-xl border border-slate-200 dark:border-slate-800 bg-white dark:bg-slate-900 text-sm font-medium text-[#006634] dark:text-blue-400 hover:shadow-md transition-all disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -131,20 +131,27 @@ export default function ProjectWorkspace() {
     ), { duration: 5000 });
   };
 
+  // Exports run as background jobs: queue one, poll until it finishes, then download it
   const generateExcel = async () => {
     setGenerating(true);
-    const promise = fetch(`/api/projects/${id}/generate-excel`, { method: "POST" }).then(async res => {
+    const promise = (async () => {
+      const res = await fetch(`/api/projects/${id}/export-jobs`, { method: "POST" });
       if (!res.ok) throw new Error();
-      const blob = await res.blob();
-      const url = window.URL.createObjectURL(blob);
+      let job = await res.json();
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const poll = await fetch(`/api/jobs/${job.id}`);
+        if (!poll.ok) throw new Error();
+        job = await poll.json();
+      }
+      if (job.status !== "done") throw new Error(job.error || "Export failed");
       const a = document.createElement("a");
-      a.href = url;
-      a.download = `${project.title.replace(/\s+/g, '_')}_Schedule.xlsx`;
+      a.href = job.download_url;
+      a.download = job.filename;
       document.body.appendChild(a);
       a.click();
       a.remove();
-      window.URL.revokeObjectURL(url);
-    }).finally(() => {
+    })().finally(() => {
       setGenerating(false);
       setPreviewOpen(false);
     });